@@ -2,16 +2,85 @@
 """CLI runner for Advent of Code solutions."""
 
 import argparse
+import contextlib
 import importlib
+import io
+import json
+import os
 import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+from modules.utils import answer_cache, profiling
 
-def run_solution(module, year: int, day: int, part: int | None = None):
-    """Run the solution module with proper error handling."""
+PROJECT_ROOT = Path(__file__).parent
+SOLUTIONS_DIR = PROJECT_ROOT / "solutions"
+TIMINGS_FILE = PROJECT_ROOT / ".cache" / "timings.json"
 
-    # Try the new solve() pattern first
-    if hasattr(module, "solve"):
+
+class Tee(io.TextIOBase):
+    """Text stream forwarding everything written to several streams."""
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text: str) -> int:
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+    def flush(self) -> None:
+        for stream in self.streams:
+            stream.flush()
+
+
+def run_solution(
+    module,
+    year: int,
+    day: int,
+    part: int | None = None,
+    use_cache: bool = True,
+    refresh: bool = False,
+) -> bool:
+    """Run the solution module, reusing its cached output when nothing it depends on changed.
+
+    The cache is keyed by the input file, the solution source and the modules.utils sources
+    it imports. With refresh, the solution always runs and the cached entry is replaced.
+    Returns True if the output came from the cache.
+    """
+    if not use_cache:
+        execute_solution(module, year, day, part)
+        return False
+
+    input_file = SOLUTIONS_DIR / f"year_{year}" / "inputs" / f"day_{day:02d}.txt"
+    key = answer_cache.cache_key(Path(module.__file__), input_file, year, day, part)
+
+    if not refresh:
+        cached_output = answer_cache.load(key)
+        if cached_output is not None:
+            print(cached_output, end="")
+            return True
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(Tee(sys.stdout, output)):
+        execute_solution(module, year, day, part)
+
+    answer_cache.store(key, output.getvalue())
+    return False
+
+
+def execute_solution(module, year: int, day: int, part: int | None = None):
+    """Run the solution module with proper error handling.
+
+    Modules may define parse_input(data: str), which receives the stripped input text and
+    returns whatever part_one/part_two expect. When it is defined, the input is parsed once
+    here and the result is handed to both parts.
+    """
+
+    # Try the new solve() pattern first, unless the module exposes its parse step
+    if hasattr(module, "solve") and not hasattr(module, "parse_input"):
         # The solve() function handles everything internally
         if part:
             print("Note: solve() runs both parts. Use --part with part_one/part_two pattern.")
@@ -19,7 +88,7 @@ def run_solution(module, year: int, day: int, part: int | None = None):
         return
 
     # Fall back to part_one/part_two pattern
-    input_file = Path(f"solutions/year_{year}/inputs/day_{day:02d}.txt")
+    input_file = SOLUTIONS_DIR / f"year_{year}" / "inputs" / f"day_{day:02d}.txt"
 
     if not input_file.exists():
         print(f"❌ Input file not found: {input_file}")
@@ -27,6 +96,9 @@ def run_solution(module, year: int, day: int, part: int | None = None):
 
     data = input_file.read_text().strip()
 
+    if hasattr(module, "parse_input"):
+        data = module.parse_input(data)
+
     # Determine which parts to run
     run_part_1 = part is None or part == 1
     run_part_2 = part is None or part == 2
@@ -61,6 +133,214 @@ def run_solution(module, year: int, day: int, part: int | None = None):
             sys.exit(1)
 
 
+def get_part_function(module, part: int):
+    """Return the function solving a part (part_one or part1 style), or None."""
+    names = ("part_one", "part1") if part == 1 else ("part_two", "part2")
+    for name in names:
+        if hasattr(module, name):
+            return getattr(module, name)
+    return None
+
+
+def suffixed_path(path: Path, part: int, parts: list[int]) -> Path:
+    """Add the part to a file name when several parts write to the same path."""
+    if len(parts) == 1:
+        return path
+    return path.with_name(f"{path.stem}_part{part}{path.suffix}")
+
+
+def profile_solution(
+    module,
+    year: int,
+    day: int,
+    part: int | None = None,
+    top: int = 20,
+    pstats_path: Path | None = None,
+    collapsed_path: Path | None = None,
+):
+    """Profile the selected parts of a solution and print their hottest functions.
+
+    Only the part functions are profiled: importing the module, reading the input and
+    parse_input run beforehand. With pstats_path the raw profile is written for
+    pstats/snakeviz, with collapsed_path the part is run once more under a stack sampler and
+    the samples are written as collapsed stacks for flame graph tools.
+    """
+    input_file = SOLUTIONS_DIR / f"year_{year}" / "inputs" / f"day_{day:02d}.txt"
+    data = input_file.read_text().strip() if input_file.exists() else None
+
+    if hasattr(module, "parse_input"):
+        if data is None:
+            print(f"❌ Input file not found: {input_file}")
+            sys.exit(1)
+        data = module.parse_input(data)
+
+    parts = [part] if part else [1, 2]
+
+    for part_number in parts:
+        func = get_part_function(module, part_number)
+        if func is None:
+            print(f"❌ Part {part_number} function not found")
+            sys.exit(1)
+
+        args = ()
+        if func.__code__.co_argcount > 0:
+            if data is None:
+                print(f"❌ Input file not found: {input_file}")
+                sys.exit(1)
+            args = (data,)
+
+        result, profiler, sampler = profiling.profile_call(
+            func, *args, sample=collapsed_path is not None
+        )
+
+        print(f"Part {part_number}: {result}")
+        print("=" * 60)
+        print(profiling.hot_functions_report(profiler, top))
+
+        if pstats_path:
+            path = suffixed_path(pstats_path, part_number, parts)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(path)
+            print(f"📝 Profile written to {path}")
+
+        if sampler:
+            path = suffixed_path(collapsed_path, part_number, parts)
+            sampler.write_collapsed(path)
+            print(f"📝 Collapsed stacks written to {path}")
+
+
+def discover_solutions(year: int | None = None) -> list[tuple[int, int]]:
+    """Find every (year, day) that has a solution module, optionally for a single year."""
+    solutions = []
+
+    for solution_file in SOLUTIONS_DIR.glob("year_*/day_*.py"):
+        solution_year = int(solution_file.parent.name.removeprefix("year_"))
+        solution_day = int(solution_file.stem.removeprefix("day_"))
+
+        if year is None or solution_year == year:
+            solutions.append((solution_year, solution_day))
+
+    return sorted(solutions)
+
+
+def timing_key(year: int, day: int) -> str:
+    """Key used for a day in the timings file."""
+    return f"{year}/{day:02d}"
+
+
+def load_timings() -> dict[str, float]:
+    """Load the last recorded wall time (in seconds) of every day."""
+    if not TIMINGS_FILE.exists():
+        return {}
+
+    try:
+        return json.loads(TIMINGS_FILE.read_text())
+    except json.JSONDecodeError:
+        return {}
+
+
+def save_timings(timings: dict[str, float]) -> None:
+    """Persist the recorded wall times, merging with the existing ones."""
+    recorded = load_timings()
+    recorded.update(timings)
+
+    TIMINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    TIMINGS_FILE.write_text(json.dumps(recorded, indent=2, sort_keys=True))
+
+
+def run_day(
+    year: int, day: int, use_cache: bool = True, refresh: bool = False
+) -> tuple[int, int, str, float | None, str | None]:
+    """Run a single day in the current process, capturing everything it prints.
+
+    Returns (year, day, output, elapsed seconds or None if cached, error message or None).
+    """
+    output = io.StringIO()
+    error = None
+    cached = False
+    start = time.perf_counter()
+
+    try:
+        with contextlib.redirect_stdout(output):
+            module = importlib.import_module(f"solutions.year_{year}.day_{day:02d}")
+            cached = run_solution(module, year, day, use_cache=use_cache, refresh=refresh)
+    except SystemExit:
+        error = "solution exited early"
+    # A failing day is reported with its traceback instead of taking down the --all pool
+    except Exception:  # noqa: BLE001
+        error = traceback.format_exc()
+
+    elapsed = None if cached else time.perf_counter() - start
+    return year, day, output.getvalue(), elapsed, error
+
+
+def run_all(
+    year: int | None = None,
+    jobs: int | None = None,
+    use_cache: bool = True,
+    refresh: bool = False,
+) -> bool:
+    """Run every discovered day on a process pool, printing results as they finish.
+
+    Days are scheduled longest-expected-first based on the last recorded timings, so the
+    slowest day starts immediately and the wall time approaches that of the slowest day.
+    Days without a recorded timing are scheduled first, and days answered from the answer
+    cache keep their previous timing. Returns True if every day succeeded.
+    """
+    solutions = discover_solutions(year)
+
+    if not solutions:
+        print(f"❌ No solutions found{f' for year {year}' if year else ''}")
+        return False
+
+    timings = load_timings()
+    solutions.sort(key=lambda s: timings.get(timing_key(*s), float("inf")), reverse=True)
+
+    jobs = jobs or os.cpu_count() or 1
+    print(f"🎄 Running {len(solutions)} solutions on {jobs} workers")
+    print("=" * 60)
+
+    new_timings = {}
+    failures = []
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(run_day, *solution, use_cache=use_cache, refresh=refresh)
+            for solution in solutions
+        ]
+
+        for future in as_completed(futures):
+            solution_year, solution_day, output, elapsed, error = future.result()
+
+            status = "❌" if error else "✅"
+            duration = "cached" if elapsed is None else f"{elapsed:.2f}s"
+            print(f"{status} Year {solution_year}, Day {solution_day:02d} ({duration})")
+            for line in output.splitlines():
+                print(f"   {line}")
+            if error:
+                for line in error.splitlines():
+                    print(f"   {line}")
+                failures.append((solution_year, solution_day))
+            elif elapsed is not None:
+                new_timings[timing_key(solution_year, solution_day)] = elapsed
+
+    wall_time = time.perf_counter() - start
+    total_time = sum(new_timings.values())
+
+    print("=" * 60)
+    print(f"Wall time: {wall_time:.2f}s (sum of days: {total_time:.2f}s)")
+
+    save_timings(new_timings)
+
+    if failures:
+        failed = ", ".join(f"{y} day {d}" for y, d in sorted(failures))
+        print(f"❌ {len(failures)} failed: {failed}")
+        return False
+
+    return True
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Run Advent of Code solutions.",
@@ -70,15 +350,54 @@ Examples:
   uv run main.py 2015 1           # Run both parts
   uv run main.py 2015 1 --part 1  # Run only part 1
   uv run main.py 2025 5 --part 2  # Run only part 2
+  uv run main.py --all            # Run every solution in parallel
+  uv run main.py --all --year 2015 --jobs 8
+  uv run main.py 2015 4 --refresh # Ignore and replace the cached answer
+  uv run main.py 2015 7 --profile --part 1 --pstats day07.pstats --collapsed day07.folded
         """,
     )
-    parser.add_argument("year", type=int, help="Year (e.g., 2015, 2025)")
-    parser.add_argument("day", type=int, help="Day (1-25)")
+    parser.add_argument("year", type=int, nargs="?", help="Year (e.g., 2015, 2025)")
+    parser.add_argument("day", type=int, nargs="?", help="Day (1-25)")
     parser.add_argument(
         "--part", type=int, choices=[1, 2], help="Run only part 1 or 2 (default: run both)"
     )
+    parser.add_argument("--all", action="store_true", help="Run every solution")
+    parser.add_argument("--year", dest="only_year", type=int, help="With --all, only run this year")
+    parser.add_argument(
+        "--jobs", type=int, help="With --all, number of worker processes (default: CPU count)"
+    )
+
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Neither read nor write the answer cache"
+    )
+    parser.add_argument(
+        "--refresh", action="store_true", help="Recompute and replace cached answers"
+    )
+
+    parser.add_argument(
+        "--profile", action="store_true", help="Profile the selected parts with cProfile"
+    )
+    parser.add_argument(
+        "--top", type=int, default=20, help="With --profile, number of functions to show"
+    )
+    parser.add_argument(
+        "--pstats", type=Path, help="With --profile, write the raw profile to this file"
+    )
+    parser.add_argument(
+        "--collapsed",
+        type=Path,
+        help="With --profile, sample the stack and write collapsed stacks for flame graphs",
+    )
 
     args = parser.parse_args()
+    use_cache = not args.no_cache
+
+    if args.all:
+        success = run_all(args.only_year or args.year, args.jobs, use_cache, args.refresh)
+        sys.exit(0 if success else 1)
+
+    if args.year is None or args.day is None:
+        parser.error("year and day are required unless --all is given")
 
     # Validate day range
     if not 1 <= args.day <= 25:
@@ -89,8 +408,14 @@ Examples:
         # Import the solution module
         module = importlib.import_module(f"solutions.year_{args.year}.day_{args.day:02d}")
 
+        if args.profile:
+            profile_solution(
+                module, args.year, args.day, args.part, args.top, args.pstats, args.collapsed
+            )
+            return
+
         # Run the solution
-        run_solution(module, args.year, args.day, args.part)
+        run_solution(module, args.year, args.day, args.part, use_cache, args.refresh)
 
     except ModuleNotFoundError:
         print(f"❌ Solution not found: year {args.year}, day {args.day}")
@@ -101,8 +426,6 @@ Examples:
         sys.exit(1)
     except Exception as e:
         print(f"❌ Error running solution: {e}")
-        import traceback
-
         traceback.print_exc()
         sys.exit(1)
 
@@ -0,0 +1,111 @@
+"""Persistent on-disk cache of solution answers.
+
+Entries are keyed by the puzzle input, the solution source and the sources of the
+modules.utils modules it (transitively) imports, so editing any of them invalidates
+only the days that depend on it.
+"""
+
+import ast
+import hashlib
+import json
+import os
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+CACHE_DIR = PROJECT_ROOT / ".cache" / "answers"
+MAX_CACHE_BYTES = 4 * 1024 * 1024
+UTILS_PACKAGE = "modules.utils"
+
+
+def imported_utils(source_file: Path) -> set[Path]:
+    """Find the modules.utils source files imported (transitively) by a source file."""
+    found: set[Path] = set()
+    pending = [source_file]
+
+    while pending:
+        tree = ast.parse(pending.pop().read_text())
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+
+            for name in names:
+                if not name.startswith(UTILS_PACKAGE + "."):
+                    continue
+
+                path = PROJECT_ROOT.joinpath(*name.split(".")).with_suffix(".py")
+                if path.exists() and path not in found:
+                    found.add(path)
+                    pending.append(path)
+
+    return found
+
+
+def cache_key(source_file: Path, input_file: Path, year: int, day: int, part: int | None) -> str:
+    """Compute the cache key of a run of a solution."""
+    digest = hashlib.sha256(f"{year}/{day}/{part}".encode())
+
+    digest.update(input_file.read_bytes() if input_file.exists() else b"")
+
+    for path in [source_file, *sorted(imported_utils(source_file))]:
+        digest.update(path.relative_to(PROJECT_ROOT).as_posix().encode())
+        digest.update(path.read_bytes())
+
+    return digest.hexdigest()
+
+
+def load(key: str) -> str | None:
+    """Return the cached output for a key, or None on a miss."""
+    entry = CACHE_DIR / f"{key}.json"
+
+    try:
+        text = entry.read_text()
+    except OSError:
+        return None
+
+    try:
+        output = json.loads(text).get("output")
+    except json.JSONDecodeError:
+        return None
+
+    if output is None:
+        return None
+
+    # Mark the entry as recently used for the LRU eviction
+    entry.touch()
+    return output
+
+
+def store(key: str, output: str, max_bytes: int = MAX_CACHE_BYTES) -> None:
+    """Cache the output for a key, evicting the least recently used entries if needed."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    (CACHE_DIR / f"{key}.json").write_text(json.dumps({"output": output}))
+
+    evict(max_bytes)
+
+
+def evict(max_bytes: int = MAX_CACHE_BYTES) -> None:
+    """Remove the least recently used entries until the cache fits in max_bytes."""
+    entries = []
+    for entry in CACHE_DIR.glob("*.json"):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry))
+
+    total_size = sum(size for _, size, _ in entries)
+
+    for _, size, entry in sorted(entries):
+        if total_size <= max_bytes:
+            break
+
+        try:
+            os.remove(entry)
+        except FileNotFoundError:
+            pass
+        total_size -= size
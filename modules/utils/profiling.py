@@ -0,0 +1,98 @@
+"""Profiling helpers for individual solution parts."""
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Self
+
+
+class StackSampler:
+    """Sample the call stack of the current thread from a background thread.
+
+    The samples are kept as collapsed stacks ("outer;inner;leaf" -> count), the input
+    format of flamegraph.pl, speedscope and similar tools. Only frames from root_code
+    downwards are kept, so the runner itself does not show up in the flame graph.
+    """
+
+    def __init__(self, root_code=None, interval: float = 0.001):
+        self.root_code = root_code
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> Self:
+        # The sampler only runs when the GIL is handed over, so hand it over as often
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+
+            while frame is not None:
+                code = frame.f_code
+                location = f"{Path(code.co_filename).name}:{code.co_firstlineno}"
+                stack.append(f"{code.co_name} ({location})")
+                if code is self.root_code:
+                    break
+                frame = frame.f_back
+            else:
+                if self.root_code is not None:
+                    # Sampled before entering or after leaving the profiled function
+                    continue
+
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write_collapsed(self, path: Path) -> None:
+        """Write the samples as collapsed stacks, one "stack count" line each."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.items()))
+
+
+def profile_call(
+    func: Callable, *args, sample: bool = False, interval: float = 0.001
+) -> tuple[Any, cProfile.Profile, StackSampler | None]:
+    """Call func under cProfile, optionally sampling its stack for a flame graph as well.
+
+    Sampling happens in a second, uninstrumented call: cProfile would otherwise both skew
+    the samples and profile the sampling thread. Returns the result of the profiled call,
+    the profiler and the sampler (None without sample).
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args)
+
+    if not sample:
+        return result, profiler, None
+
+    with StackSampler(func.__code__, interval) as sampler:
+        func(*args)
+
+    return result, profiler, sampler
+
+
+def hot_functions_report(profiler: cProfile.Profile, top: int = 20) -> str:
+    """Render the top functions by cumulative and by self time."""
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report).strip_dirs()
+
+    for sort_key, title in (("cumulative", "cumulative time"), ("tottime", "self time")):
+        report.write(f"Top {top} functions by {title}:\n")
+        stats.sort_stats(sort_key).print_stats(top)
+
+    return report.getvalue()
@@ -1,83 +1,313 @@
 #!/usr/bin/env python3
 """Benchmark AoC solutions."""
 
+import argparse
+import gc
 import importlib
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
 import sys
 import time
+import tracemalloc
+from datetime import UTC, datetime
 from pathlib import Path
+from typing import Self
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from main import discover_solutions, timing_key
 
-def benchmark_solution(year: int, day: int, runs: int = 10):
-    """Benchmark a solution."""
-    try:
-        module = importlib.import_module(f"solutions.year_{year}.day_{day:02d}")
-        input_file = Path(f"solutions/year_{year}/inputs/day_{day:02d}.txt")
+DEFAULT_RESULTS_FILE = project_root / ".cache" / "benchmarks" / "results.json"
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_TOP_ALLOCATIONS = 5
+DEFAULT_SCALE_START = 4
+DEFAULT_SCALE_BUDGET = 1.0
+DEFAULT_SCALE_STEPS = 20
+MIN_FIT_TIME = 1e-4
+DEFAULT_CALIBRATION_BUDGET = 2.0
+CALIBRATION_SAMPLE_TIME = 0.02
+MAX_CALIBRATED_RUNS = 1000
+PARTS = {1: ("part_one", "part1"), 2: ("part_two", "part2")}
 
-        if not input_file.exists():
-            print(f"❌ Input file not found: {input_file}")
-            return
 
-        data = input_file.read_text().strip()
+def load_input(year: int, day: int) -> str:
+    """Read the raw input of a day, or an empty string for days without an input file."""
+    input_file = project_root / "solutions" / f"year_{year}" / "inputs" / f"day_{day:02d}.txt"
+    return input_file.read_text().strip() if input_file.exists() else ""
 
-        # Check if using solve() pattern
-        if hasattr(module, "parse_input"):
-            data = module.parse_input(data)
 
-        print(f"🎄 Benchmarking Year {year}, Day {day}")
-        print("=" * 60)
+def get_part(module, part: int):
+    """Return the function solving the given part, or None if the module has none."""
+    for name in PARTS[part]:
+        if hasattr(module, name):
+            return getattr(module, name)
+    return None
 
-        # Benchmark part 1
-        if hasattr(module, "part_one"):
-            part_func = module.part_one
 
-            # Warm-up run
-            result = part_func(data)
+def call_part(func, data):
+    """Call a part function, passing the input only if it expects arguments."""
+    return func(data) if func.__code__.co_argcount > 0 else func()
 
-            # Actual benchmark
-            times = []
-            for _ in range(runs):
-                start = time.perf_counter()
-                part_func(data)
-                end = time.perf_counter()
-                times.append(end - start)
 
-            avg_time = sum(times) / len(times)
-            min_time = min(times)
-            max_time = max(times)
+class GCTimer:
+    """gc callback adding up the time spent in garbage collections while registered."""
+
+    def __init__(self):
+        self.total = 0.0
+        self._start = 0.0
+
+    def __call__(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self.total += time.perf_counter() - self._start
+
+    def __enter__(self) -> Self:
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        gc.callbacks.remove(self)
+
+
+def calibrate(func, data, sample_time: float = CALIBRATION_SAMPLE_TIME) -> tuple[int, float]:
+    """Find how many calls make up one timing sample, like timeit's autorange.
+
+    Tries 1, 2, 5, 10, 20, 50, ... calls until they take at least sample_time. Returns
+    the number of calls and the time they took.
+    """
+    number = 1
+    while True:
+        for multiplier in (1, 2, 5):
+            loops = number * multiplier
+            start = time.perf_counter()
+            for _ in range(loops):
+                call_part(func, data)
+            elapsed = time.perf_counter() - start
+
+            if elapsed >= sample_time:
+                return loops, elapsed
+        number *= 10
 
-            print(f"Part 1: {result}")
-            print(f"  Average: {avg_time * 1000:>8.2f}ms ({runs} runs)")
-            print(f"  Min:     {min_time * 1000:>8.2f}ms")
-            print(f"  Max:     {max_time * 1000:>8.2f}ms")
-            print()
 
-        # Benchmark part 2
-        if hasattr(module, "part_two"):
-            part_func = module.part_two
+def reject_outliers(times: list[float]) -> list[float]:
+    """Drop the samples outside Tukey's fences (1.5 IQR beyond the quartiles)."""
+    if len(times) < 4:
+        return times
 
-            # Warm-up run
-            result = part_func(data)
+    q1, _, q3 = statistics.quantiles(times, n=4)
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    return [t for t in times if low <= t <= high]
+
+
+def time_part(
+    func,
+    data,
+    runs: int,
+    budget: float | None = None,
+    disable_gc: bool = False,
+    outliers: bool = False,
+) -> tuple[object, list[float], dict]:
+    """Time a part (or parse) function over several runs after one warm-up run.
+
+    With budget, the run count is calibrated instead: fast functions are called several
+    times per sample and as many samples are taken as fit in budget seconds. With
+    disable_gc, the collector is off during samples and collects between them instead, so
+    the samples exclude GC pauses (GC time is reported either way).
+    With outliers, samples outside Tukey's fences are dropped.
+
+    Returns the result of the warm-up run, the duration (in seconds) of every kept run and
+    details: calls per sample, rejected samples and garbage collection time per call.
+    """
+    # Warm-up run
+    result = call_part(func, data)
+
+    number = 1
+    if budget is not None:
+        number, sample_time = calibrate(func, data)
+        runs = max(1, min(MAX_CALIBRATED_RUNS, int(budget / sample_time)))
+
+    gc_was_enabled = gc.isenabled()
+    times = []
+
+    with GCTimer() as gc_timer:
+        try:
+            if disable_gc:
+                gc.disable()
 
-            # Actual benchmark
-            times = []
             for _ in range(runs):
                 start = time.perf_counter()
-                part_func(data)
+                for _ in range(number):
+                    call_part(func, data)
                 end = time.perf_counter()
-                times.append(end - start)
+                times.append((end - start) / number)
+
+                if disable_gc:
+                    # Everything allocated while disabled is still in the youngest generation
+                    gc.collect(0)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    kept = reject_outliers(times) if outliers else times
+
+    return (
+        result,
+        kept,
+        {
+            "loops": number,
+            "rejected": len(times) - len(kept),
+            "gc": gc_timer.total / (runs * number),
+        },
+    )
+
+
+def measure_memory(func, data, top: int = DEFAULT_TOP_ALLOCATIONS) -> dict:
+    """Run a part (or parse) function once under tracemalloc.
+
+    Records the peak traced memory during the call, the net allocation still alive
+    afterwards (including the returned value) and the sites holding most of it.
+    """
+    tracemalloc.start()
+    try:
+        result = call_part(func, data)
+        net, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        )
+    finally:
+        tracemalloc.stop()
+
+    del result
 
-            avg_time = sum(times) / len(times)
-            min_time = min(times)
-            max_time = max(times)
+    return {
+        "peak": peak,
+        "net": net,
+        "top": [
+            {
+                "site": f"{Path(stat.traceback[0].filename).name}:{stat.traceback[0].lineno}",
+                "size": stat.size,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[:top]
+        ],
+    }
 
-            print(f"Part 2: {result}")
-            print(f"  Average: {avg_time * 1000:>8.2f}ms ({runs} runs)")
-            print(f"  Min:     {min_time * 1000:>8.2f}ms")
-            print(f"  Max:     {max_time * 1000:>8.2f}ms")
+
+def format_bytes(size: float) -> str:
+    """Format a number of bytes with a binary unit."""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GiB"
+
+
+def summarize(times: list[float]) -> dict[str, float]:
+    """Compute the statistics recorded for a list of run durations."""
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "p95": statistics.quantiles(times, n=20, method="inclusive")[18]
+        if len(times) > 1
+        else times[0],
+        "max": max(times),
+        "mean": statistics.fmean(times),
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "runs": len(times),
+    }
+
+
+def run_benchmark(
+    year: int, day: int, runs: int, memory: bool = False, timing: dict | None = None
+) -> dict[str, dict]:
+    """Benchmark every part of a day, returning the answer and statistics per part.
+
+    With memory, every step also runs once more under tracemalloc, after the timed runs
+    so the tracing overhead does not affect the timings. timing holds the noise-control
+    keyword arguments of time_part.
+    """
+    timing = timing or {}
+    module = importlib.import_module(f"solutions.year_{year}.day_{day:02d}")
+    data = load_input(year, day)
+
+    results = {}
+
+    # Parse once and hand the parsed input to both parts, timing the parse step on its own
+    if hasattr(module, "parse_input"):
+        raw_data = data
+        data, times, details = time_part(module.parse_input, raw_data, runs, **timing)
+        results["parse"] = {"answer": type(data).__name__, **summarize(times), **details}
+
+        if memory:
+            results["parse"]["memory"] = measure_memory(module.parse_input, raw_data)
+
+    for part in PARTS:
+        part_func = get_part(module, part)
+        if part_func is None:
+            continue
+
+        result, times, details = time_part(part_func, data, runs, **timing)
+        results[f"part_{part}"] = {"answer": str(result), **summarize(times), **details}
+
+        if memory:
+            results[f"part_{part}"]["memory"] = measure_memory(part_func, data)
+
+    return results
+
+
+def print_part(name: str, stats: dict) -> None:
+    """Print the human-readable timings of a single part."""
+    print(f"{name}: {stats['answer']}")
+    runs = f"{stats['runs']} runs"
+    if stats.get("loops", 1) > 1:
+        runs += f" x {stats['loops']} calls"
+    if stats.get("rejected"):
+        runs += f", {stats['rejected']} outliers rejected"
+
+    print(f"  Average: {stats['mean'] * 1000:>8.2f}ms ({runs})")
+    print(f"  Min:     {stats['min'] * 1000:>8.2f}ms")
+    print(f"  Median:  {stats['median'] * 1000:>8.2f}ms")
+    print(f"  P95:     {stats['p95'] * 1000:>8.2f}ms")
+    print(f"  Max:     {stats['max'] * 1000:>8.2f}ms")
+    print(f"  Stddev:  {stats['stddev'] * 1000:>8.2f}ms")
+    if "gc" in stats:
+        print(f"  GC:      {stats['gc'] * 1000:>8.2f}ms per run")
+
+    if "memory" in stats:
+        memory = stats["memory"]
+        print(f"  Peak:    {format_bytes(memory['peak']):>10}")
+        print(f"  Net:     {format_bytes(memory['net']):>10}")
+        for allocation in memory["top"]:
+            print(
+                f"    {format_bytes(allocation['size']):>10} "
+                f"in {allocation['count']:>7} blocks at {allocation['site']}"
+            )
+
+
+def benchmark_solution(
+    year: int, day: int, runs: int = 10, memory: bool = False, timing: dict | None = None
+):
+    """Benchmark a solution."""
+    try:
+        print(f"🎄 Benchmarking Year {year}, Day {day}")
+        print("=" * 60)
+
+        results = run_benchmark(year, day, runs, memory, timing)
+
+        for part, stats in results.items():
+            if part == "parse":
+                print_part("Parse", {**stats, "answer": f"-> {stats['answer']}"})
+            else:
+                print_part(part.replace("_", " ").capitalize(), stats)
+            print()
 
     except ModuleNotFoundError as e:
         print(f"❌ Solution not found: {e}")
@@ -89,19 +319,415 @@ def benchmark_solution(year: int, day: int, runs: int = 10):
         traceback.print_exc()
 
 
+def fit_exponent(points: list[tuple[int, float]]) -> float | None:
+    """Fit time ~ size^k by least squares on a log-log scale, returning k.
+
+    Points faster than MIN_FIT_TIME are mostly timer noise and are left out when there
+    are enough slower ones.
+    """
+    fit_points = [(size, t) for size, t in points if t >= MIN_FIT_TIME]
+    if len(fit_points) < 2:
+        fit_points = [(size, t) for size, t in points if t > 0]
+    if len(fit_points) < 2:
+        return None
+
+    return statistics.linear_regression(
+        [math.log(size) for size, _ in fit_points], [math.log(t) for _, t in fit_points]
+    ).slope
+
+
+def scale_step(
+    module, step, budget: float, start_size: int, max_steps: int, runs: int, seed: int
+) -> list[tuple[int, float]]:
+    """Time one step (parse or part) on generated inputs of size n, 2n, 4n, ...
+
+    Stops once a size exceeds the time budget, or when the growth seen between the last
+    two sizes predicts the next size would. Returns (size, best time) for every size.
+    """
+    parse_input = getattr(module, "parse_input", None)
+    points = []
+    size = start_size
+
+    for _ in range(max_steps):
+        data = module.generate_input(size, random.Random(seed))
+        if parse_input is not None and step is not parse_input:
+            data = parse_input(data)
+
+        _, times, _ = time_part(step, data, runs)
+        points.append((size, min(times)))
+        print(f"  {size:>12}  {min(times) * 1000:>12.3f}ms", flush=True)
+
+        if min(times) > budget:
+            break
+
+        if len(points) >= 2:
+            (previous_size, previous_time), (last_size, last_time) = points[-2:]
+            # Timings below the timer resolution give no usable growth rate
+            if min(previous_time, last_time) >= MIN_FIT_TIME:
+                growth = math.log(last_time / previous_time) / math.log(last_size / previous_size)
+                if last_time * 2**growth > budget:
+                    break
+
+        size *= 2
+
+    return points
+
+
+def scale_solution(
+    year: int,
+    day: int,
+    budget: float = DEFAULT_SCALE_BUDGET,
+    start_size: int = DEFAULT_SCALE_START,
+    max_steps: int = DEFAULT_SCALE_STEPS,
+    runs: int = 3,
+    seed: int = 0,
+):
+    """Measure how a solution scales with its input size.
+
+    Inputs come from the module's optional generate_input(size, rng) function, which
+    returns raw input text of the given size. Every step is timed on sizes n, 2n, 4n, ...,
+    then a complexity exponent is fitted and the largest size within budget reported.
+    """
+    module = importlib.import_module(f"solutions.year_{year}.day_{day:02d}")
+
+    if not hasattr(module, "generate_input"):
+        print(f"❌ Year {year}, Day {day} has no generate_input() to scale with")
+        return
+
+    print(f"🎄 Scaling Year {year}, Day {day} (budget {budget:.2f}s per run)")
+    print("=" * 60)
+
+    steps = []
+    if hasattr(module, "parse_input"):
+        steps.append(("Parse", module.parse_input))
+    for part in PARTS:
+        part_func = get_part(module, part)
+        if part_func is not None and part_func.__code__.co_argcount > 0:
+            steps.append((f"Part {part}", part_func))
+
+    for name, step in steps:
+        print(f"{name}:")
+        print(f"  {'size':>12}  {'time':>14}")
+
+        points = scale_step(module, step, budget, start_size, max_steps, runs, seed)
+        exponent = fit_exponent(points)
+        within_budget = [size for size, t in points if t <= budget]
+        last_size, last_time = points[-1]
+
+        if exponent is None:
+            print("  Exponent: n/a")
+        else:
+            print(f"  Exponent: n^{exponent:.2f}")
+
+        if not within_budget:
+            print("  Largest size within budget: none")
+        elif exponent is not None and exponent > 0 and last_time > 0:
+            extrapolated = last_size * (budget / last_time) ** (1 / exponent)
+            print(
+                f"  Largest size within budget: {max(within_budget)}"
+                f" (~{int(extrapolated)} extrapolated)"
+            )
+        else:
+            print(f"  Largest size within budget: {max(within_budget)}")
+        print()
+
+
+def git_commit() -> str:
+    """Return the current git commit, marked with '-dirty' for uncommitted changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return "unknown"
+
+    if commit.returncode or status.returncode:
+        return "unknown"
+
+    commit, status = commit.stdout.strip(), status.stdout.strip()
+    return f"{commit}-dirty" if status else commit
+
+
+def benchmark_suite(
+    year: int | None, runs: int, memory: bool = False, timing: dict | None = None
+) -> dict:
+    """Benchmark every discovered solution and return the full results document.
+
+    Days that raise are recorded under "failures" with their error instead of results.
+    """
+    results = {}
+    failures = {}
+
+    for solution_year, solution_day in discover_solutions(year):
+        key = timing_key(solution_year, solution_day)
+        print(f"⏱️  {key} ...", end=" ", flush=True)
+
+        try:
+            results[key] = run_benchmark(solution_year, solution_day, runs, memory, timing)
+        # A failing day is recorded under "failures" instead of aborting the whole suite
+        except Exception as e:  # noqa: BLE001
+            print(f"❌ {e}")
+            failures[key] = f"{type(e).__name__}: {e}"
+            continue
+
+        summaries = []
+        for part, stats in results[key].items():
+            summary = f"{part} {stats['median'] * 1000:.2f}ms"
+            if "memory" in stats:
+                summary += f" (peak {format_bytes(stats['memory']['peak'])})"
+            summaries.append(summary)
+        print(", ".join(summaries))
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "commit": git_commit(),
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "year": year,
+        "runs": runs,
+        "memory": memory,
+        "timing": timing or {},
+        "cpu_affinity": sorted(os.sched_getaffinity(0))
+        if hasattr(os, "sched_getaffinity")
+        else None,
+        "results": results,
+        "failures": failures,
+    }
+
+
+def pin_to_cpu(cpu: int | None = None) -> int | None:
+    """Pin this process to a single CPU (the last allowed one by default).
+
+    Returns the CPU pinned to, or None where the platform does not support it.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        print("⚠️  CPU pinning is not supported on this platform")
+        return None
+
+    if cpu is None:
+        cpu = max(os.sched_getaffinity(0))
+
+    os.sched_setaffinity(0, {cpu})
+    return cpu
+
+
+def compare_results(
+    current: dict, baseline: dict, threshold: float, metric: str = "median"
+) -> list[str]:
+    """Compare two results documents, returning a description of every regression.
+
+    A part regresses when its metric grew by more than the threshold (0.10 = 10%), and
+    when it is in the baseline but missing from the current results, e.g. because its
+    day crashed. Baseline days outside the year the current run was limited to are skipped.
+    """
+    regressions = []
+    failures = current.get("failures", {})
+    year = current.get("year")
+
+    for key, parts in baseline["results"].items():
+        if year is not None and not key.startswith(f"{year}/"):
+            continue
+
+        for part in parts:
+            if part not in current["results"].get(key, {}):
+                reason = f"crashed ({failures[key]})" if key in failures else "missing"
+                regressions.append(f"{key} {part}: {reason}")
+
+    for key, parts in current["results"].items():
+        for part, stats in parts.items():
+            baseline_stats = baseline["results"].get(key, {}).get(part)
+            if baseline_stats is None or baseline_stats[metric] <= 0:
+                continue
+
+            ratio = stats[metric] / baseline_stats[metric]
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{key} {part}: {baseline_stats[metric] * 1000:.2f}ms -> "
+                    f"{stats[metric] * 1000:.2f}ms ({(ratio - 1) * 100:+.1f}%)"
+                )
+
+    return regressions
+
+
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: python scripts/benchmark.py YEAR DAY [RUNS]")
-        print("\nExamples:")
-        print("  python scripts/benchmark.py 2015 1")
-        print("  python scripts/benchmark.py 2015 1 100")
+    parser = argparse.ArgumentParser(
+        description="Benchmark Advent of Code solutions.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/benchmark.py 2015 1
+  python scripts/benchmark.py 2015 1 100
+  python scripts/benchmark.py --suite --year 2015
+  python scripts/benchmark.py --suite --baseline baseline.json --threshold 0.2
+  python scripts/benchmark.py --suite --output baseline.json
+  python scripts/benchmark.py 2015 6 --memory
+  python scripts/benchmark.py 2015 7 --scale --budget 0.5
+  python scripts/benchmark.py 2015 1 --stable
+  python scripts/benchmark.py --suite --calibrate 1 --no-gc --cpu 3 --reject-outliers
+        """,
+    )
+    parser.add_argument("year", type=int, nargs="?", help="Year (e.g., 2015, 2025)")
+    parser.add_argument("day", type=int, nargs="?", help="Day (1-25)")
+    parser.add_argument(
+        "runs", type=int, nargs="?", help="Timed runs per part (default: 10, 3 with --scale)"
+    )
+    parser.add_argument("--suite", action="store_true", help="Benchmark every solution")
+    parser.add_argument(
+        "--year", dest="only_year", type=int, help="With --suite, only benchmark this year"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_RESULTS_FILE,
+        help="With --suite, JSON file to write the results to",
+    )
+    parser.add_argument(
+        "--baseline", type=Path, help="With --suite, JSON results file to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown before a part counts as a regression (default: 0.10 = 10%%)",
+    )
+    parser.add_argument(
+        "--metric",
+        choices=["min", "median", "p95"],
+        default="median",
+        help="Statistic compared against the baseline (default: median)",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Also record tracemalloc peak/net allocation and top allocation sites",
+    )
+    parser.add_argument(
+        "--scale",
+        action="store_true",
+        help="Time each part on generated inputs of doubling size and fit its complexity",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_SCALE_BUDGET,
+        help="With --scale, time budget in seconds per run (default: 1.0)",
+    )
+    parser.add_argument(
+        "--start-size",
+        type=int,
+        default=DEFAULT_SCALE_START,
+        help="With --scale, first generated input size (default: 4)",
+    )
+    parser.add_argument(
+        "--max-steps",
+        type=int,
+        default=DEFAULT_SCALE_STEPS,
+        help="With --scale, maximum number of size doublings (default: 20)",
+    )
+    parser.add_argument(
+        "--calibrate",
+        type=float,
+        metavar="SECONDS",
+        help="Calibrate the run count (timeit autorange style) to fit this budget per part",
+    )
+    parser.add_argument(
+        "--no-gc",
+        action="store_true",
+        help="Disable the garbage collector while timing, collecting between runs",
+    )
+    parser.add_argument("--cpu", type=int, help="Pin the benchmark to this CPU")
+    parser.add_argument(
+        "--reject-outliers", action="store_true", help="Drop runs beyond 1.5 IQR of quartiles"
+    )
+    parser.add_argument(
+        "--stable",
+        action="store_true",
+        help="Shorthand for --calibrate 2 --no-gc --reject-outliers, pinned to one CPU",
+    )
+
+    args = parser.parse_args()
+
+    if args.stable:
+        args.calibrate = args.calibrate or DEFAULT_CALIBRATION_BUDGET
+        args.no_gc = args.reject_outliers = True
+
+    if args.cpu is not None or args.stable:
+        cpu = pin_to_cpu(args.cpu)
+        if cpu is not None:
+            print(f"📌 Pinned to CPU {cpu}")
+
+    timing = {
+        "budget": args.calibrate,
+        "disable_gc": args.no_gc,
+        "outliers": args.reject_outliers,
+    }
+
+    if args.scale:
+        if args.year is None or args.day is None:
+            parser.error("year and day are required with --scale")
+        scale_solution(
+            args.year,
+            args.day,
+            args.budget,
+            args.start_size,
+            args.max_steps,
+            args.runs or 3,
+        )
         return
 
-    year = int(sys.argv[1])
-    day = int(sys.argv[2])
-    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    runs = args.runs or 10
+
+    if not args.suite:
+        if args.year is None or args.day is None:
+            parser.error("year and day are required unless --suite is given")
+        benchmark_solution(args.year, args.day, runs, args.memory, timing)
+        return
+
+    results = benchmark_suite(args.only_year or args.year, runs, args.memory, timing)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\n📝 Results written to {args.output}")
+
+    if results["failures"]:
+        print(f"❌ {len(results['failures'])} solution(s) failed:")
+        for key, error in results["failures"].items():
+            print(f"   {key}: {error}")
+
+    if args.baseline is None:
+        if results["failures"]:
+            sys.exit(1)
+        return
+
+    if not args.baseline.exists():
+        print(f"❌ Baseline not found: {args.baseline}")
+        sys.exit(1)
+
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare_results(results, baseline, args.threshold, args.metric)
+
+    print(f"🔍 Compared against {args.baseline} (commit {baseline.get('commit', 'unknown')})")
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) (threshold {args.threshold:.0%}):")
+        for regression in regressions:
+            print(f"   {regression}")
+        sys.exit(1)
+
+    if results["failures"]:
+        sys.exit(1)
 
-    benchmark_solution(year, day, runs)
+    print("✅ No regressions")
 
 
 if __name__ == "__main__":
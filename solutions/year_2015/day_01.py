@@ -1,8 +1,15 @@
 """Advent of Code 2015 - Day 1: Not Quite Lisp"""
 
+import random
+
 from modules.utils.input_reader import read_raw
 
 
+def generate_input(size: int, rng: random.Random) -> str:
+    """Generate a random string of size opening and closing parentheses."""
+    return "".join(rng.choices("()", k=size))
+
+
 def part_one(data: str) -> int:
     """Find the final floor.
 
@@ -1,14 +1,27 @@
 """Advent of Code 2015 - Day 2: I Was Told There Would Be No Math"""
 
-from modules.utils.input_reader import read_lines
+import random
 
+from modules.utils.input_reader import read_raw
 
-def part_one(data: list[str]) -> int:
+
+def parse_input(data: str) -> list[tuple[int, int, int]]:
+    """Parse every 'LxWxH' line into a (length, width, height) tuple."""
+    return [tuple(map(int, line.split("x"))) for line in data.splitlines()]
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """Generate size presents with random dimensions from 1 to 30, one 'LxWxH' per line."""
+    return "\n".join(
+        f"{rng.randint(1, 30)}x{rng.randint(1, 30)}x{rng.randint(1, 30)}" for _ in range(size)
+    )
+
+
+def part_one(data: list[tuple[int, int, int]]) -> int:
     """Solve part one of the challenge."""
     total_area = 0
 
-    for line in data:
-        length, width, height = map(int, line.split("x"))
+    for length, width, height in data:
         side1 = length * width
         side2 = width * height
         side3 = height * length
@@ -19,12 +32,11 @@ def part_one(data: list[str]) -> int:
     return total_area
 
 
-def part_two(data: list[str]) -> int:
+def part_two(data: list[tuple[int, int, int]]) -> int:
     """Solve part two of the challenge."""
     total_ribbon = 0
 
-    for line in data:
-        length, width, height = map(int, line.split("x"))
+    for length, width, height in data:
         bow = length * width * height
         wrap = 2 * (length + width + height - max(length, width, height))
         total_ribbon += bow + wrap
@@ -34,7 +46,7 @@ def part_two(data: list[str]) -> int:
 
 def solve():
     """Main solve function."""
-    data = read_lines(2015, 2)
+    data = parse_input(read_raw(2015, 2))
 
     print(f"Part 1: {part_one(data)}")
     print(f"Part 2: {part_two(data)}")
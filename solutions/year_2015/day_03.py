@@ -1,8 +1,15 @@
 """Advent of Code 2015 - Day 3: Perfectly Spherical Houses in a Vacuum"""
 
+import random
+
 from modules.utils.input_reader import read_raw
 
 
+def generate_input(size: int, rng: random.Random) -> str:
+    """Generate a random string of size '<>^v' moves."""
+    return "".join(rng.choices("<>^v", k=size))
+
+
 def part_one(data: str) -> int:
     """Solve part one of the challenge."""
     houses_visited = set()
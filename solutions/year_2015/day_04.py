@@ -1,10 +1,26 @@
 """Advent of Code 2015 - Day 4: The Ideal Stocking Stuffer"""
 
 import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import cache
 from itertools import count
+from pathlib import Path
 
 PUZZLE_INPUT = "ckczppom"
 
+BLOCK_SIZE = 100_000
+ABORT_CHECK_INTERVAL = 4096
+CHECKPOINT_INTERVAL = 5.0
+NOT_FOUND = sys.maxsize
+
+# Lowest number reaching the target difficulty found by any worker so far
+_lowest_found = None
+
 
 def find_md5_with_leading_zeros(prefix: str, leading_zeros: int) -> int:
     """Find the lowest positive number that produces an MD5 hash
@@ -22,20 +38,231 @@ def find_md5_with_leading_zeros(prefix: str, leading_zeros: int) -> int:
     raise RuntimeError("Hash not found")
 
 
+def leading_zero_nibbles(digest: bytes) -> int:
+    """Count the leading zero hex digits of a raw digest."""
+    zeros = 0
+
+    for byte in digest:
+        if byte:
+            return zeros + (byte < 0x10)
+        zeros += 2
+
+    return zeros
+
+
+def init_worker(lowest_found) -> None:
+    """Give a worker process access to the shared lowest target number."""
+    global _lowest_found
+    _lowest_found = lowest_found
+
+
+def search_block(
+    prefix: str, leading_zeros: int, start: int, stop: int
+) -> tuple[dict[int, int], int]:
+    """Search the numbers in [start, stop), recording the first number of every difficulty.
+
+    The key is hashed once and its MD5 state copied for every number, and digests are
+    checked as raw bytes. The search stops at the first number with leading_zeros zeros,
+    or early once another worker found one below start.
+
+    Returns the first number per number of leading zeros seen, and where the search
+    stopped (stop when the whole block was searched).
+    """
+    key_hash = hashlib.md5(prefix.encode("utf-8"))
+    first_numbers: dict[int, int] = {}
+
+    for chunk_start in range(start, stop, ABORT_CHECK_INTERVAL):
+        if _lowest_found is not None and _lowest_found.value < start:
+            return first_numbers, chunk_start
+
+        for number in range(chunk_start, min(chunk_start + ABORT_CHECK_INTERVAL, stop)):
+            number_hash = key_hash.copy()
+            number_hash.update(b"%d" % number)
+            digest = number_hash.digest()
+
+            # 15 out of 16 digests do not even start with a zero
+            if digest[0] >= 0x10:
+                continue
+
+            zeros = leading_zero_nibbles(digest)
+            for level in range(1, zeros + 1):
+                first_numbers.setdefault(level, number)
+
+            if zeros >= leading_zeros:
+                if _lowest_found is not None:
+                    with _lowest_found.get_lock():
+                        _lowest_found.value = min(_lowest_found.value, number)
+                return first_numbers, number + 1
+
+    return first_numbers, stop
+
+
+class NonceSearch:
+    """Incremental search for the lowest numbers giving MD5 hashes with leading zeros.
+
+    Every difficulty level seen is remembered while scanning, so asking for a higher
+    level continues from where the previous search stopped instead of starting at 1.
+    With a checkpoint file, progress is saved periodically and resumed on creation.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        workers: int | None = 1,
+        block_size: int = BLOCK_SIZE,
+        checkpoint: Path | None = None,
+    ):
+        self.prefix = prefix
+        self.workers = workers or os.cpu_count() or 1
+        self.block_size = block_size
+        self.checkpoint = checkpoint
+        # Every number below next_number has been hashed
+        self.next_number = 1
+        # Lowest number per number of leading zeros, for every level seen so far
+        self.found: dict[int, int] = {}
+        self.hashes = 0
+        self.elapsed = 0.0
+        self._last_save = time.monotonic()
+
+        if checkpoint is not None and checkpoint.exists():
+            self.load()
+
+    @property
+    def hash_rate(self) -> float:
+        """Hashes computed per second over all searches so far."""
+        return self.hashes / self.elapsed if self.elapsed else 0.0
+
+    def find(self, leading_zeros: int) -> int:
+        """Return the lowest number whose hash starts with leading_zeros zeros."""
+        if leading_zeros not in self.found:
+            start_time = time.perf_counter()
+
+            if self.workers == 1:
+                self._search_in_process(leading_zeros)
+            else:
+                self._search_in_parallel(leading_zeros)
+
+            self.elapsed += time.perf_counter() - start_time
+            self.save()
+
+        return self.found[leading_zeros]
+
+    def _record(self, first_numbers: dict[int, int], scanned_until: int) -> None:
+        """Merge the results of a block that continues right where the search stopped."""
+        for level, number in first_numbers.items():
+            self.found.setdefault(level, number)
+
+        self.hashes += scanned_until - self.next_number
+        self.next_number = scanned_until
+
+        if time.monotonic() - self._last_save >= CHECKPOINT_INTERVAL:
+            self.save()
+
+    def _search_in_process(self, leading_zeros: int) -> None:
+        """Search block by block in the current process."""
+        while leading_zeros not in self.found:
+            start = self.next_number
+            self._record(*search_block(self.prefix, leading_zeros, start, start + self.block_size))
+
+    def _search_in_parallel(self, leading_zeros: int) -> None:
+        """Search contiguous blocks on a process pool, confirming them in order.
+
+        A block is only merged once every lower block has been, so the levels found are
+        always the lowest numbers. Once the target level is hit, no new blocks are handed
+        out and workers on higher blocks stop early.
+        """
+        lowest_found = multiprocessing.Value("q", NOT_FOUND)
+        executor = ProcessPoolExecutor(
+            self.workers, initializer=init_worker, initargs=(lowest_found,)
+        )
+
+        pending = {}
+        block_results = {}
+        next_start = self.next_number
+
+        try:
+            while leading_zeros not in self.found:
+                while lowest_found.value == NOT_FOUND and len(pending) < 2 * self.workers:
+                    future = executor.submit(
+                        search_block,
+                        self.prefix,
+                        leading_zeros,
+                        next_start,
+                        next_start + self.block_size,
+                    )
+                    pending[future] = next_start
+                    next_start += self.block_size
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    block_results[pending.pop(future)] = future.result()
+
+                while self.next_number in block_results:
+                    self._record(*block_results.pop(self.next_number))
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def save(self) -> None:
+        """Write the search progress to the checkpoint file, if any."""
+        if self.checkpoint is None:
+            return
+
+        self.checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        self.checkpoint.write_text(
+            json.dumps(
+                {
+                    "prefix": self.prefix,
+                    "next_number": self.next_number,
+                    "found": self.found,
+                    "hashes": self.hashes,
+                    "elapsed": self.elapsed,
+                }
+            )
+        )
+        self._last_save = time.monotonic()
+
+    def load(self) -> None:
+        """Resume the search progress from the checkpoint file."""
+        progress = json.loads(self.checkpoint.read_text())
+
+        if progress["prefix"] != self.prefix:
+            raise ValueError(
+                f"Checkpoint {self.checkpoint} is for prefix {progress['prefix']!r}, "
+                f"not {self.prefix!r}"
+            )
+
+        self.next_number = progress["next_number"]
+        self.found = {int(level): number for level, number in progress["found"].items()}
+        self.hashes = progress["hashes"]
+        self.elapsed = progress["elapsed"]
+
+
+@cache
+def shared_search(prefix: str) -> NonceSearch:
+    """Return the search for a prefix shared by both parts.
+
+    Part two then continues where part one stopped, even when the parts are called
+    separately.
+    """
+    return NonceSearch(prefix, workers=None)
+
+
 def part_one() -> int:
     """Solve part one of the challenge."""
-    return find_md5_with_leading_zeros(PUZZLE_INPUT, 5)
+    return shared_search(PUZZLE_INPUT).find(5)
 
 
 def part_two() -> int:
     """Solve part two of the challenge."""
-    return find_md5_with_leading_zeros(PUZZLE_INPUT, 6)
+    return shared_search(PUZZLE_INPUT).find(6)
 
 
 def solve():
     """Main solve function."""
-    print(f"Part 1: {part_one()}")
-    print(f"Part 2: {part_two()}")
+    search = shared_search(PUZZLE_INPUT)
+
+    print(f"Part 1: {search.find(5)}")
+    print(f"Part 2: {search.find(6)}")
 
 
 if __name__ == "__main__":
@@ -1,6 +1,9 @@
 """Advent of Code 2015 - Day 5: Doesn't He Have Intern-Elves For This?"""
 
-from modules.utils.input_reader import read_lines
+import random
+from string import ascii_lowercase
+
+from modules.utils.input_reader import read_raw
 
 
 def find_nice_strings(data: list[str], allow_overlapping: bool) -> int:
@@ -43,6 +46,16 @@ def find_nice_strings(data: list[str], allow_overlapping: bool) -> int:
     return nice_strings_count
 
 
+def parse_input(data: str) -> list[str]:
+    """Split the input into the strings to check."""
+    return [line.strip() for line in data.splitlines()]
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """Generate size random lowercase strings of 16 letters, like the puzzle input."""
+    return "\n".join("".join(rng.choices(ascii_lowercase, k=16)) for _ in range(size))
+
+
 def part_one(data: list[str]) -> int:
     """Solve part one of the challenge."""
 
@@ -58,7 +71,7 @@ def part_two(data: list[str]) -> int:
 def solve():
     """Main solve function."""
 
-    data = read_lines(2015, 5)
+    data = parse_input(read_raw(2015, 5))
 
     print(f"Part 1: {part_one(data)}")
     print(f"Part 2: {part_two(data)}")
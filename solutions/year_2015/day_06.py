@@ -1,6 +1,30 @@
 """Advent of Code 2015 - Day 6: Probably a Fire Hazard"""
 
-from modules.utils.input_reader import read_lines
+import random
+from operator import mul
+
+import numpy as np
+
+from modules.utils.input_reader import read_raw
+
+GRID_SIZE = 1000
+# Compressed cells composed at a time on grids too large to allocate densely
+BAND_CELLS = 1 << 22
+# Instructions composed by slicing their own small grid rather than by merging halves
+LEAF_INSTRUCTIONS = 16
+# Instructions composed over the whole grid at once, rather than a band at a time
+FRONTIER_INSTRUCTIONS = 256
+
+# On the compressed grid every action is a function of a light's state, kept as two
+# arrays so that functions compose: on/off lights go to (x & keep) ^ flip, brightness
+# goes to max(x + add, floor)
+SWITCH_FUNCTIONS = {"on": (False, True), "off": (False, False), "toggle": (True, True)}
+BRIGHTNESS_FUNCTIONS = {"on": (1, 0), "off": (-1, 0), "toggle": (2, 0)}
+
+Instruction = tuple[str, tuple[int, int], tuple[int, int]]
+LightFunctions = tuple[np.ndarray, np.ndarray]
+# Edges of the compressed cells on both axes, and the light functions of the cells
+FunctionGrid = tuple[np.ndarray, np.ndarray, LightFunctions]
 
 
 def get_coordinates(coord_string: str) -> tuple[int, int]:
@@ -9,7 +33,7 @@ def get_coordinates(coord_string: str) -> tuple[int, int]:
     return int(x_str), int(y_str)
 
 
-def get_instruction(line: str) -> tuple[str, tuple[int, int], tuple[int, int]]:
+def get_instruction(line: str) -> Instruction:
     """Parse an instruction line into action and coordinate tuples."""
     parts = line.strip().split(" ")
     if parts[0] == "turn":
@@ -23,70 +47,239 @@ def get_instruction(line: str) -> tuple[str, tuple[int, int], tuple[int, int]]:
     return action, start_coords, end_coords
 
 
-def part_one(data: list[str]) -> int:
-    """Solve part one of the challenge."""
+def switch_lights(lights: np.ndarray, action: str) -> None:
+    """Turn on, turn off or toggle a region of on/off lights in place."""
+    if action == "on":
+        lights[...] = True
+    elif action == "off":
+        lights[...] = False
+    elif action == "toggle":
+        np.logical_not(lights, out=lights)
 
-    light_grid = [[0 for _ in range(1000)] for _ in range(1000)]
-    lights_on = 0
-
-    for line in data:
-        action, start_coords, end_coords = get_instruction(line)
-
-        start_x_coordinate, start_y_coordinate = start_coords
-        end_x_coordinate, end_y_coordinate = end_coords
-
-        for x in range(start_x_coordinate, end_x_coordinate + 1):
-            for y in range(start_y_coordinate, end_y_coordinate + 1):
-                if action == "on":
-                    if light_grid[x][y] == 0:
-                        light_grid[x][y] = 1
-                        lights_on += 1
-                elif action == "off":
-                    if light_grid[x][y] == 1:
-                        light_grid[x][y] = 0
-                        lights_on -= 1
-                elif action == "toggle":
-                    if light_grid[x][y] == 1:
-                        light_grid[x][y] = 0
-                        lights_on -= 1
-                    else:
-                        light_grid[x][y] = 1
-                        lights_on += 1
-
-    return lights_on
-
-
-def part_two(data: list[str]) -> int:
-    """Solve part two of the challenge."""
 
-    light_grid = [[0 for _ in range(1000)] for _ in range(1000)]
-    total_brightness = 0
+def adjust_brightness(lights: np.ndarray, action: str) -> None:
+    """Raise or lower the brightness of a region of lights in place, never below zero."""
+    if action == "on":
+        lights += 1
+    elif action == "off":
+        lights -= 1
+        np.maximum(lights, 0, out=lights)
+    elif action == "toggle":
+        lights += 2
+
+
+class LightGrid:
+    """Dense grid of lights, indexed [x, y], where every instruction is a single slice operation.
+
+    Lights are either on or off, or with brightness, have a brightness of zero or more.
+    """
+
+    def __init__(self, width: int = GRID_SIZE, height: int = GRID_SIZE, brightness: bool = False):
+        self.lights = np.zeros((width, height), dtype=np.int64 if brightness else bool)
+        self.update = adjust_brightness if brightness else switch_lights
+
+    def apply(self, instruction: Instruction) -> None:
+        """Apply an instruction to its (inclusive) rectangle of lights."""
+        action, (start_x, start_y), (end_x, end_y) = instruction
+        self.update(self.lights[start_x : end_x + 1, start_y : end_y + 1], action)
+
+    def total(self) -> int:
+        """Number of lights that are on, or their total brightness."""
+        return int(self.lights.sum())
+
+
+def identity_functions(shape: tuple[int, int], brightness: bool) -> LightFunctions:
+    """Functions leaving every light of a region unchanged."""
+    if brightness:
+        # Brightness changes stay within twice the number of instructions
+        return np.zeros(shape, dtype=np.int32), np.zeros(shape, dtype=np.int32)
+    return np.ones(shape, dtype=bool), np.zeros(shape, dtype=bool)
+
+
+def compose(first: LightFunctions, second: LightFunctions, brightness: bool) -> LightFunctions:
+    """Compose light functions cell by cell, applying first and then second."""
+    if brightness:
+        (add_first, floor_first), (add_second, floor_second) = first, second
+        return add_first + add_second, np.maximum(floor_first + add_second, floor_second)
+
+    (keep_first, flip_first), (keep_second, flip_second) = first, second
+    return keep_first & keep_second, (flip_first & keep_second) ^ flip_second
+
+
+def merge_grids(first: FunctionGrid, second: FunctionGrid, brightness: bool) -> FunctionGrid:
+    """Compose two grids of light functions over the same region on the union of their edges."""
+    edges_x = np.union1d(first[0], second[0])
+    edges_y = np.union1d(first[1], second[1])
+
+    def expand(grid: FunctionGrid) -> LightFunctions:
+        own_x, own_y, functions = grid
+        rows = np.searchsorted(own_x, edges_x[:-1], side="right") - 1
+        columns = np.searchsorted(own_y, edges_y[:-1], side="right") - 1
+        return tuple(function.take(rows, axis=0).take(columns, axis=1) for function in functions)
+
+    return edges_x, edges_y, compose(expand(first), expand(second), brightness)
+
+
+def restrict_grid(grid: FunctionGrid, start_x: int, end_x: int) -> FunctionGrid:
+    """The part of a grid of light functions between x coordinates start_x and end_x."""
+    edges_x, edges_y, functions = grid
+    first = np.searchsorted(edges_x, start_x, side="right") - 1
+    last = np.searchsorted(edges_x, end_x)
+    restricted_x = np.concatenate(([start_x], edges_x[first + 1 : last], [end_x]))
+
+    return restricted_x, edges_y, tuple(function[first:last] for function in functions)
+
+
+def region_functions(
+    rectangles: np.ndarray, actions: list[str], region: np.ndarray, brightness: bool
+) -> FunctionGrid:
+    """Compose the instructions, in order, into one function per compressed cell of a region.
+
+    rectangles holds one [start_x, start_y, end_x, end_y) row per instruction inside region,
+    which is [start_x, start_y, end_x, end_y) as well. Both halves of the instructions are
+    composed on their own, coarser grids and then merged on the union of their edges, so
+    every level of the recursion costs about the size of the final grid.
 
-    for line in data:
-        action, start_coords, end_coords = get_instruction(line)
+    Returns the x and y edges of the compressed cells and the functions of the cells.
+    """
+    if len(actions) > LEAF_INSTRUCTIONS:
+        middle = len(actions) // 2
+        return merge_grids(
+            region_functions(rectangles[:middle], actions[:middle], region, brightness),
+            region_functions(rectangles[middle:], actions[middle:], region, brightness),
+            brightness,
+        )
 
-        start_x_coordinate, start_y_coordinate = start_coords
-        end_x_coordinate, end_y_coordinate = end_coords
+    # Few enough instructions to apply one by one on their own small grid
+    edges_x = np.unique(np.concatenate((region[0::2], rectangles[:, 0::2].ravel())))
+    edges_y = np.unique(np.concatenate((region[1::2], rectangles[:, 1::2].ravel())))
+    start_x, end_x = np.searchsorted(edges_x, rectangles[:, 0::2]).T.tolist()
+    start_y, end_y = np.searchsorted(edges_y, rectangles[:, 1::2]).T.tolist()
+    functions = identity_functions((len(edges_x) - 1, len(edges_y) - 1), brightness)
+    action_functions = BRIGHTNESS_FUNCTIONS if brightness else SWITCH_FUNCTIONS
 
-        for x in range(start_x_coordinate, end_x_coordinate + 1):
-            for y in range(start_y_coordinate, end_y_coordinate + 1):
-                if action == "on":
-                    light_grid[x][y] += 1
-                    total_brightness += 1
-                elif action == "off":
-                    if light_grid[x][y] > 0:
-                        light_grid[x][y] -= 1
-                        total_brightness -= 1
-                elif action == "toggle":
-                    light_grid[x][y] += 2
-                    total_brightness += 2
+    for index, action in enumerate(actions):
+        cells = slice(start_x[index], end_x[index]), slice(start_y[index], end_y[index])
+        composed = compose(
+            tuple(function[cells] for function in functions), action_functions[action], brightness
+        )
+        for function, cell_functions in zip(functions, composed):
+            function[cells] = cell_functions
 
-    return total_brightness
+    return edges_x, edges_y, functions
+
+
+def compressed_total(
+    instructions: list[Instruction], brightness: bool = False, band_cells: int = BAND_CELLS
+) -> int:
+    """Count the lights that are on, or their total brightness, on a coordinate-compressed grid.
+
+    The rectangle edges split both axes into intervals that every instruction either fully
+    covers or misses, so each compressed cell stands for a block of identical lights and
+    counts with its area. Rather than applying every instruction to every cell it covers,
+    which costs the number of instructions times the number of cells, the instructions are
+    composed into one function per cell by halving them in time order.
+
+    Groups of up to FRONTIER_INSTRUCTIONS are composed once by region_functions and kept.
+    The few larger groups above them would need the whole grid, so they are merged a band
+    of x coordinates at a time, keeping memory near a few times band_cells plus the kept
+    groups however large the coordinates get.
+    """
+    if not instructions:
+        return 0
+
+    actions = [action for action, _, _ in instructions]
+    starts = np.array([start for _, start, _ in instructions], dtype=np.int64)
+    # Exclusive ends, so every rectangle is [start, end) on both axes
+    ends = np.array([end for _, _, end in instructions], dtype=np.int64) + 1
+    rectangles = np.concatenate((starts, ends), axis=1)
+
+    edges_x = np.unique(rectangles[:, 0::2])
+    edges_y = np.unique(rectangles[:, 1::2])
+    region = np.array([edges_x[0], edges_y[0], edges_x[-1], edges_y[-1]])
+    band_columns = max(1, band_cells // (len(edges_y) - 1))
+    groups: dict[tuple[int, int], FunctionGrid] = {}
+
+    def group_functions(start: int, stop: int, band_x: int, band_end_x: int) -> FunctionGrid:
+        if stop - start > FRONTIER_INSTRUCTIONS:
+            middle = (start + stop) // 2
+            return merge_grids(
+                group_functions(start, middle, band_x, band_end_x),
+                group_functions(middle, stop, band_x, band_end_x),
+                brightness,
+            )
+
+        if (start, stop) not in groups:
+            groups[start, stop] = region_functions(
+                rectangles[start:stop], actions[start:stop], region, brightness
+            )
+        return restrict_grid(groups[start, stop], band_x, band_end_x)
+
+    total = 0
+
+    for band_start in range(0, len(edges_x) - 1, band_columns):
+        band_end = min(band_start + band_columns, len(edges_x) - 1)
+        cell_edges_x, cell_edges_y, functions = group_functions(
+            0, len(actions), edges_x[band_start], edges_x[band_end]
+        )
+
+        # The functions applied to lights that start off (or at zero brightness)
+        lights = np.maximum(*functions) if brightness else functions[1]
+        # Row totals fit in an int64; weighing them by the widths may not
+        row_totals = lights.astype(np.int64, copy=False) @ np.diff(cell_edges_y)
+        total += sum(map(mul, row_totals.tolist(), np.diff(cell_edges_x).tolist()))
+
+    return total
+
+
+def total_lights(instructions: list[Instruction], brightness: bool = False) -> int:
+    """Follow the instructions on a dense grid if they fit on it, on a compressed one otherwise."""
+    fits = all(
+        0 <= coordinate < GRID_SIZE
+        for _, start, end in instructions
+        for coordinate in (*start, *end)
+    )
+    if not fits:
+        return compressed_total(instructions, brightness)
+
+    grid = LightGrid(brightness=brightness)
+    for instruction in instructions:
+        grid.apply(instruction)
+
+    return grid.total()
+
+
+def parse_input(data: str) -> list[Instruction]:
+    """Parse every line of the input into an instruction."""
+    return [get_instruction(line) for line in data.splitlines()]
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """Generate size random turn on/turn off/toggle instructions on the 1000x1000 grid."""
+    lines = []
+
+    for _ in range(size):
+        action = rng.choice(["turn on", "turn off", "toggle"])
+        start_x, end_x = sorted(rng.randrange(GRID_SIZE) for _ in range(2))
+        start_y, end_y = sorted(rng.randrange(GRID_SIZE) for _ in range(2))
+        lines.append(f"{action} {start_x},{start_y} through {end_x},{end_y}")
+
+    return "\n".join(lines)
+
+
+def part_one(data: list[Instruction]) -> int:
+    """Solve part one of the challenge."""
+    return total_lights(data)
+
+
+def part_two(data: list[Instruction]) -> int:
+    """Solve part two of the challenge."""
+    return total_lights(data, brightness=True)
 
 
 def solve():
     """Main solve function."""
-    data = read_lines(2015, 6)
+    data = parse_input(read_raw(2015, 6))
 
     print(f"Part 1: {part_one(data)}")
     print(f"Part 2: {part_two(data)}")
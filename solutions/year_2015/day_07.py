@@ -1,145 +1,456 @@
 """Advent of Code 2015 - Day 7: Some Assembly Required"""
 
-from modules.utils.input_reader import read_lines
-
-
-def compute_bitwise_operation(left: int, operator: str, right: int) -> int:
-    """Compute the result of a bitwise operation."""
-    if operator == "AND":
-        return left & right
-    elif operator == "OR":
-        return left | right
-    elif operator == "LSHIFT":
-        return (left << right) & 0xFFFF
-    elif operator == "RSHIFT":
-        return (left >> right) & 0xFFFF
-    else:
-        raise ValueError(f"Unknown operator: {operator}")
+import heapq
+import random
+from collections.abc import Iterable
+from string import ascii_lowercase
+from typing import Self
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from modules.utils.input_reader import read_raw
+
+MASK = 0xFFFF
+
+# Every gate takes two operands; NOT and plain wires ignore the second one
+GATE_FUNCTIONS = {
+    "AND": lambda left, right: left & right,
+    "OR": lambda left, right: left | right,
+    "LSHIFT": lambda left, right: (left << right) & MASK,
+    "RSHIFT": lambda left, right: (left >> right) & MASK,
+    "NOT": lambda value, _: ~value & MASK,
+    "WIRE": lambda value, _: value,
+}
+# Operators written between two operands
+BINARY_GATES = frozenset({"AND", "OR", "LSHIFT", "RSHIFT"})
+
+# Vectorised gates writing into out, for evaluating many input vectors at once
+BATCH_GATE_FUNCTIONS = {
+    "AND": lambda left, right, out: np.bitwise_and(left, right, out=out),
+    "OR": lambda left, right, out: np.bitwise_or(left, right, out=out),
+    "LSHIFT": lambda left, right, out: np.left_shift(left, right, out=out),
+    "RSHIFT": lambda left, right, out: np.right_shift(left, right, out=out),
+    "NOT": lambda value, _, out: np.invert(value, out=out),
+    "WIRE": lambda value, _, out: np.copyto(out, value),
+}
+BATCH_CHUNK_SIZE = 1 << 16
+
+Operand = str | int
+Gate = tuple[str, tuple[Operand, ...]]
+
+
+def parse_operand(token: str) -> Operand:
+    """Parse an operand into a constant signal or the name of a wire."""
+    return int(token) if token.isdigit() else token
+
+
+def parse_gate(instruction: str) -> Gate:
+    """Parse a bitwise instruction into its operator and operands."""
+    tokens = instruction.split()
+
+    if len(tokens) == 1:
+        return "WIRE", (parse_operand(tokens[0]),)
+    if len(tokens) == 2 and tokens[0] == "NOT":
+        return "NOT", (parse_operand(tokens[1]),)
+    if len(tokens) == 3 and tokens[1] in BINARY_GATES:
+        return tokens[1], (parse_operand(tokens[0]), parse_operand(tokens[2]))
+
+    raise ValueError(f"Unknown instruction: {instruction!r}")
+
+
+def topological_order(gates: dict[str, Gate]) -> list[str]:
+    """Order the wires so every wire comes after the wires driving it.
+
+    Raises ValueError for wires that are used but never driven, and for cycles.
+    """
+    dependents: dict[str, list[str]] = {wire: [] for wire in gates}
+    missing_inputs: dict[str, int] = {}
+
+    for wire, (_, operands) in gates.items():
+        inputs = {operand for operand in operands if isinstance(operand, str)}
+        for operand in inputs:
+            if operand not in gates:
+                raise ValueError(f"Wire {operand!r} drives {wire!r} but is never driven itself")
+            dependents[operand].append(wire)
+        missing_inputs[wire] = len(inputs)
+
+    order = [wire for wire, count in missing_inputs.items() if count == 0]
+
+    for wire in order:
+        for dependent in dependents[wire]:
+            missing_inputs[dependent] -= 1
+            if missing_inputs[dependent] == 0:
+                order.append(dependent)
+
+    if len(order) < len(gates):
+        cycle = " -> ".join(find_cycle(gates, order))
+        raise ValueError(f"Circuit contains a cycle through: {cycle}")
+
+    return order
+
+
+def find_cycle(gates: dict[str, Gate], ordered: list[str]) -> list[str]:
+    """Find a cycle among the wires that could not be ordered."""
+    unordered = set(gates) - set(ordered)
+    wire = next(iter(unordered))
+    path: list[str] = []
+    seen: dict[str, int] = {}
+
+    # Every unordered wire has an unordered input, so walking inputs must revisit a wire
+    while wire not in seen:
+        seen[wire] = len(path)
+        path.append(wire)
+        wire = next(
+            operand
+            for operand in gates[wire][1]
+            if isinstance(operand, str) and operand in unordered
+        )
+
+    return path[seen[wire] :] + [wire]
+
+
+class Circuit:
+    """A circuit compiled once into topological order and evaluated in linear time.
+
+    Wires are numbered in topological order and followed by one slot per distinct
+    constant, so every gate reads its operands from a flat list of signals.
+    """
+
+    def __init__(self, gates: dict[str, Gate]):
+        self.gates = gates
+        self.wires = topological_order(gates)
+        self.index = {wire: index for index, wire in enumerate(self.wires)}
+
+        constants = sorted(
+            {
+                operand
+                for _, operands in gates.values()
+                for operand in operands
+                if isinstance(operand, int)
+            }
+        )
+        self.constants = [constant & MASK for constant in constants]
+        constant_slots = {
+            constant: len(self.wires) + slot for slot, constant in enumerate(constants)
+        }
+
+        def slot(operand: Operand) -> int:
+            return self.index[operand] if isinstance(operand, str) else constant_slots[operand]
+
+        self.compiled = []
+        self.operators = []
+        # Gates reading each wire, for propagating changes downstream
+        self.dependents: list[list[int]] = [[] for _ in self.wires]
+
+        for index, wire in enumerate(self.wires):
+            operator, operands = gates[wire]
+            left = slot(operands[0])
+            right = slot(operands[1]) if len(operands) > 1 else left
+            self.compiled.append((GATE_FUNCTIONS[operator], left, right))
+            self.operators.append(operator)
+
+            for input_slot in {left, right}:
+                if input_slot < len(self.wires):
+                    self.dependents[input_slot].append(index)
+
+    @classmethod
+    def from_instructions(cls, circuit: dict[str, str]) -> Self:
+        """Compile a mapping of output wire -> bitwise instruction."""
+        return cls({wire: parse_gate(instruction) for wire, instruction in circuit.items()})
+
+    def evaluate(self, overrides: dict[str, int] | None = None) -> list[int]:
+        """Compute every signal, indexed like self.wires.
+
+        Overridden wires keep the given signal instead of the one of their gate.
+        """
+        signals = [0] * len(self.wires) + self.constants
+        override_slots = {self.index[wire]: value for wire, value in (overrides or {}).items()}
+
+        for index, (gate_function, left, right) in enumerate(self.compiled):
+            if index in override_slots:
+                signals[index] = override_slots[index]
+            else:
+                signals[index] = gate_function(signals[left], signals[right])
+
+        return signals
+
+    def signals(self, overrides: dict[str, int] | None = None) -> dict[str, int]:
+        """Compute the signal of every wire."""
+        return dict(zip(self.wires, self.evaluate(overrides)))
+
+    def batch_plan(
+        self, overrides: frozenset[int], outputs: frozenset[int]
+    ) -> tuple[list[int], dict[int, list[int]]]:
+        """Plan a batch evaluation: which gates to run, and when their signals can go.
+
+        Only gates feeding the outputs run, and overridden wires never run their gate.
+        Returns the gates in topological order and, per gate, the wires last read by it.
+        """
+        needed = set()
+        pending = list(outputs)
+
+        while pending:
+            index = pending.pop()
+            if index in needed:
+                continue
+            needed.add(index)
+
+            if index not in overrides:
+                _, left, right = self.compiled[index]
+                pending.extend(slot for slot in (left, right) if slot < len(self.wires))
+
+        gates = sorted(needed)
+        last_reader: dict[int, int] = {}
+        for index in gates:
+            if index not in overrides:
+                _, left, right = self.compiled[index]
+                for slot in (left, right):
+                    if slot < len(self.wires):
+                        last_reader[slot] = index
+
+        released: dict[int, list[int]] = {}
+        for slot, index in last_reader.items():
+            if slot not in outputs:
+                released.setdefault(index, []).append(slot)
+
+        return gates, released
+
+    def evaluate_batch(
+        self,
+        overrides: dict[str, ArrayLike],
+        outputs: Iterable[str] = ("a",),
+        chunk_size: int = BATCH_CHUNK_SIZE,
+    ) -> dict[str, np.ndarray]:
+        """Evaluate the circuit for many input vectors at once.
+
+        overrides maps wires to arrays of signals (one per input vector) or to a single
+        signal shared by all vectors. Every wire is held as a uint16 array and every gate is
+        one vectorised operation. Only the gates feeding the outputs run, signals nothing
+        reads anymore give their buffer back for reuse, gates with constant inputs are folded
+        and the vectors are processed in chunks of chunk_size to bound memory.
+
+        Returns the signals of the output wires, one uint16 array each.
+        """
+        override_arrays = {
+            self.index[wire]: np.asarray(value, dtype=np.uint16)
+            for wire, value in overrides.items()
+        }
+        batch_size = max((array.size for array in override_arrays.values()), default=1)
+        output_slots = {self.index[wire]: wire for wire in outputs}
+
+        gates, released = self.batch_plan(frozenset(override_arrays), frozenset(output_slots))
+        results = {wire: np.empty(batch_size, dtype=np.uint16) for wire in output_slots.values()}
+
+        for chunk_start in range(0, batch_size, chunk_size):
+            chunk = slice(chunk_start, min(chunk_start + chunk_size, batch_size))
+            chunk_overrides = {
+                index: array[chunk] if array.ndim else array
+                for index, array in override_arrays.items()
+            }
+
+            signals = self._evaluate_chunk(
+                gates, released, chunk_overrides, chunk.stop - chunk.start
+            )
+
+            for index, wire in output_slots.items():
+                results[wire][chunk] = signals[index]
+
+        return results
+
+    def _evaluate_chunk(
+        self,
+        gates: list[int],
+        released: dict[int, list[int]],
+        overrides: dict[int, np.ndarray],
+        size: int,
+    ) -> dict[int, np.ndarray | np.uint16]:
+        """Run the planned gates over one chunk of input vectors."""
+        signals: dict[int, np.ndarray | np.uint16] = {}
+        free_buffers: list[np.ndarray] = []
+        owned: set[int] = set()
+
+        def operand(slot: int) -> np.ndarray | np.uint16:
+            if slot < len(self.wires):
+                return signals[slot]
+            return np.uint16(self.constants[slot - len(self.wires)])
+
+        for index in gates:
+            if index in overrides:
+                signals[index] = overrides[index]
+            else:
+                gate_function, left, right = self.compiled[index]
+                left_signal, right_signal = operand(left), operand(right)
+
+                if isinstance(left_signal, np.ndarray) or isinstance(right_signal, np.ndarray):
+                    out = free_buffers.pop() if free_buffers else np.empty(size, dtype=np.uint16)
+                    BATCH_GATE_FUNCTIONS[self.operators[index]](left_signal, right_signal, out)
+                    signals[index] = out
+                    owned.add(index)
+                else:
+                    signals[index] = np.uint16(gate_function(int(left_signal), int(right_signal)))
+
+            for slot in released.get(index, ()):
+                if slot in owned:
+                    owned.remove(slot)
+                    free_buffers.append(signals[slot])
+                del signals[slot]
+
+        return signals
+
+
+def wire_name(index: int) -> str:
+    """Name of the index-th generated wire, using two or more lowercase letters."""
+    name = ""
+    index += len(ascii_lowercase)
+    while index:
+        index, letter = divmod(index, len(ascii_lowercase))
+        name = ascii_lowercase[letter] + name
+    return name
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """Generate a random acyclic circuit of size gates driving wire a from wire b.
+
+    The instructions are shuffled, like in the puzzle input.
+    """
+    wires = ["b"]
+    lines = [f"{rng.randrange(1 << 16)} -> b"]
+
+    for index in range(size):
+        output_wire = "a" if index == size - 1 else wire_name(index)
+        # Mostly depend on recent wires so the circuit gets deep, like the puzzle input
+        left = wires[max(0, len(wires) - rng.randint(1, 8))]
+        right = rng.choice(wires)
+        gate = rng.choices(["AND", "OR", "LSHIFT", "RSHIFT", "NOT", "WIRE"], [2, 2, 1, 1, 2, 1])[0]
+
+        if gate in ("AND", "OR"):
+            lines.append(f"{left} {gate} {right} -> {output_wire}")
+        elif gate in ("LSHIFT", "RSHIFT"):
+            lines.append(f"{left} {gate} {rng.randint(1, 15)} -> {output_wire}")
+        elif gate == "NOT":
+            lines.append(f"NOT {left} -> {output_wire}")
+        else:
+            lines.append(f"{left} -> {output_wire}")
+
+        wires.append(output_wire)
+
+    rng.shuffle(lines)
+    return "\n".join(lines)
+
+
+class CircuitSimulation:
+    """Signals of a circuit kept up to date while overriding wires.
+
+    Changing overrides only re-evaluates the gates downstream of the changed wires, in
+    topological order, and stops propagating wherever a signal does not change.
+    """
+
+    def __init__(self, circuit: Circuit):
+        self.circuit = circuit
+        self.signals = circuit.evaluate()
+        # Overridden signals by wire index
+        self.overrides: dict[int, int] = {}
+
+    def _index(self, wire: str) -> int:
+        """Index of a wire, raising ValueError for wires the circuit does not have."""
+        if wire not in self.circuit.index:
+            raise ValueError(f"Circuit has no wire {wire!r}")
+
+        return self.circuit.index[wire]
+
+    def override(self, overrides: dict[str, int]) -> None:
+        """Force wires to the given signals and update everything downstream."""
+        dirty = set()
+
+        for wire, value in overrides.items():
+            index = self._index(wire)
+            value &= MASK
+            self.overrides[index] = value
+
+            if self.signals[index] != value:
+                self.signals[index] = value
+                dirty.update(self.circuit.dependents[index])
+
+        self._propagate(dirty)
+
+    def release(self, wires: Iterable[str]) -> None:
+        """Drop the overrides of wires, driving them from their gates again."""
+        dirty = set()
+
+        for wire in wires:
+            index = self._index(wire)
+            if self.overrides.pop(index, None) is not None:
+                dirty.add(index)
+
+        self._propagate(dirty)
+
+    def _propagate(self, dirty: set[int]) -> None:
+        """Re-evaluate the dirty gates and, where their signal changes, their dependents.
+
+        Gates are processed by topological index, so each one runs at most once, after
+        all of its inputs are final.
+        """
+        heap = list(dirty)
+        heapq.heapify(heap)
+        queued = set(dirty)
+        signals = self.signals
 
+        while heap:
+            index = heapq.heappop(heap)
+            if index in self.overrides:
+                continue
 
-def complement_value(value: int) -> int:
-    """Compute the bitwise NOT of a value within 16 bits."""
-    return ~value & 0xFFFF
+            gate_function, left, right = self.circuit.compiled[index]
+            value = gate_function(signals[left], signals[right])
+            if value == signals[index]:
+                continue
 
+            signals[index] = value
+            for dependent in self.circuit.dependents[index]:
+                if dependent not in queued:
+                    queued.add(dependent)
+                    heapq.heappush(heap, dependent)
 
-def emulate_circuit(circuit: dict[str, str], processed_wires: dict[str, int]) -> dict[str, int]:
-    """Emulate the circuit until no more wires can be processed."""
-    while True:
-        progress_made = False
+    def signal(self, wire: str) -> int:
+        """Current signal of a wire."""
+        return self.signals[self._index(wire)]
 
-        for connection in circuit:
-            if connection in processed_wires:
-                continue
+    def query(self, wires: Iterable[str]) -> dict[str, int]:
+        """Current signals of several wires."""
+        return {wire: self.signal(wire) for wire in wires}
 
-            instruction = circuit[connection]
-            tokens = instruction.split(" ")
-
-            if len(tokens) == 1:
-                operand = tokens[0]
-
-                result = (
-                    processed_wires.get(operand, None)
-                    if processed_wires.get(operand, None) is not None
-                    else int(operand)
-                    if operand.isdigit()
-                    else None
-                )
-
-                if result is None:
-                    continue
-
-                processed_wires[connection] = result
-                progress_made = True
-
-            elif len(tokens) == 2:
-                operator, operand = tokens
-
-                operand_value = (
-                    processed_wires.get(operand, None)
-                    if processed_wires.get(operand, None) is not None
-                    else int(operand)
-                    if operand.isdigit()
-                    else None
-                )
-
-                if operand_value is None:
-                    continue
-
-                if operator == "NOT":
-                    result = complement_value(operand_value)
-                    processed_wires[connection] = result
-                    progress_made = True
-
-            elif len(tokens) == 3:
-                left, operator, right = tokens
-
-                left_value = (
-                    processed_wires.get(left, None)
-                    if processed_wires.get(left, None) is not None
-                    else int(left)
-                    if left.isdigit()
-                    else None
-                )
-                right_value = (
-                    processed_wires.get(right, None)
-                    if processed_wires.get(right, None) is not None
-                    else int(right)
-                    if right.isdigit()
-                    else None
-                )
-
-                if left_value is None or right_value is None:
-                    continue
-
-                result = compute_bitwise_operation(left_value, operator, right_value)
-                processed_wires[connection] = result
-                progress_made = True
-
-        if not progress_made:
-            break
-
-    return processed_wires
-
-
-def part_one(data: list[str]) -> int:
-    """Solve part one of the challenge."""
 
+def parse_input(data: str) -> Circuit:
+    """Parse and compile the instructions into a circuit."""
     circuit = {}
-    processed_wires = {}
 
-    for line in data:
+    for line in data.splitlines():
         bitwise_instruction, output_wire = line.split(" -> ")
 
         bitwise_instruction = bitwise_instruction.strip()
 
-        circuit[output_wire] = bitwise_instruction
-
-    processed_wires = emulate_circuit(circuit, processed_wires)
+        circuit[output_wire.strip()] = bitwise_instruction
 
-    return processed_wires.get("a", 0)
+    return Circuit.from_instructions(circuit)
 
 
-def part_two(data: list[str]) -> int:
-    """Solve part two of the challenge."""
-    wire_a_signal = part_one(data)
-
-    circuit = {}
-    processed_wires = {"b": wire_a_signal}
-
-    for line in data:
-        bitwise_instruction, output_wire = line.split(" -> ")
+def part_one(data: Circuit) -> int:
+    """Solve part one of the challenge."""
+    return CircuitSimulation(data).signal("a")
 
-        bitwise_instruction = bitwise_instruction.strip()
 
-        circuit[output_wire] = bitwise_instruction
-    processed_wires = emulate_circuit(circuit, processed_wires)
+def part_two(data: Circuit) -> int:
+    """Solve part two of the challenge."""
+    simulation = CircuitSimulation(data)
+    simulation.override({"b": simulation.signal("a")})
 
-    return processed_wires.get("a", 0)
+    return simulation.signal("a")
 
 
 def solve():
     """Main solve function."""
-    data = read_lines(2015, 7)
+    data = parse_input(read_raw(2015, 7))
 
     print(f"Part 1: {part_one(data)}")
     print(f"Part 2: {part_two(data)}")
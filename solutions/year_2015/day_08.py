@@ -1,6 +1,9 @@
 """Advent of Code 2015 - Day 8: Matchsticks"""
 
-from modules.utils.input_reader import read_lines
+import random
+from string import ascii_lowercase
+
+from modules.utils.input_reader import read_raw
 
 
 def count_memory_chars(line: str) -> int:
@@ -35,6 +38,17 @@ def count_memory_chars(line: str) -> int:
     return memory_chars
 
 
+def parse_input(data: str) -> list[str]:
+    """Split the input into the string literals it lists."""
+    return [line.strip() for line in data.splitlines()]
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """Generate size quoted string literals of letters and backslash, quote and hex escapes."""
+    pieces = [*ascii_lowercase, "\\\\", '\\"', "\\x27"]
+    return "\n".join(f'"{"".join(rng.choices(pieces, k=rng.randint(0, 30)))}"' for _ in range(size))
+
+
 def part_one(data: list[str]) -> int:
     """Calculate difference between literal and memory string lengths."""
 
@@ -69,7 +83,7 @@ def part_two(data: list[str]) -> int:
 
 def solve():
     """Main solve function."""
-    data = read_lines(2015, 8)
+    data = parse_input(read_raw(2015, 8))
 
     print(f"Part 1: {part_one(data)}")
     print(f"Part 2: {part_two(data)}")
@@ -1,11 +1,16 @@
 """Advent of Code 2015 - Day 9: All in a Single Night"""
 
-from itertools import pairwise, permutations
+import random
+from itertools import combinations
 
-from modules.utils.input_reader import read_lines
+import numpy as np
 
+from modules.utils.input_reader import read_raw
 
-def prepare_routes(data: list[str]) -> tuple[set[str], dict[tuple[str, str], int]]:
+Routes = tuple[set[str], dict[tuple[str, str], int]]
+
+
+def prepare_routes(data: list[str]) -> Routes:
     """
     Parse input data to extract cities and their routes with distances.
 
@@ -42,27 +47,128 @@ def prepare_routes(data: list[str]) -> tuple[set[str], dict[tuple[str, str], int
     return cities, routes
 
 
-def calculate_route_distance(
-    route: tuple[str, ...], routes: dict[tuple[str, str], int]
-) -> int | None:
+# Cost of unreachable states and missing roads; twice this still fits in an int64, and
+# any real path, even with negated distances, stays far below half of it
+UNREACHABLE = 1 << 61
+
+
+def distance_matrix(
+    cities: set[str], routes: dict[tuple[str, str], int]
+) -> tuple[list[str], np.ndarray]:
     """
-    Calculate total distance for a given route.
+    Index the cities and build the matrix of distances between them.
 
     Args:
-        route: Tuple of city names in order
+        cities: Set of all city names
         routes: Dict mapping city pairs to distances
 
     Returns:
-        Total distance if route is valid, None otherwise
+        Tuple of (city names by index, matrix of distances with UNREACHABLE
+        for pairs without a road)
     """
-    total_distance = 0
+    names = sorted(cities)
+    index = {city: position for position, city in enumerate(names)}
+    matrix = np.full((len(names), len(names)), UNREACHABLE, dtype=np.int64)
+
+    for (origin, destination), distance in routes.items():
+        matrix[index[origin], index[destination]] = distance
 
-    for city_pair in pairwise(route):
-        if city_pair not in routes:
-            return None
-        total_distance += routes[city_pair]
+    return names, matrix
 
-    return total_distance
+
+def held_karp(matrix: np.ndarray, reconstruct: bool = False) -> tuple[int | None, list[int]]:
+    """
+    Find the shortest path visiting every node exactly once (Held-Karp).
+
+    cost[mask, j] is the length of the shortest path visiting exactly the nodes in
+    mask and ending at j. Masks are handled a layer (number of nodes visited) at a
+    time, vectorised over all masks of the layer, so only two layers of costs are
+    kept in memory: O(2^n * n^2) time, O(C(n, n/2) * n) memory, plus 2^n * n bytes
+    of predecessors when reconstructing the path.
+
+    Args:
+        matrix: Square matrix of distances, UNREACHABLE where there is no road
+        reconstruct: If True, also return the order of the nodes on the path
+
+    Returns:
+        Tuple of (shortest distance or None if no path exists, node indices in
+        order, empty unless reconstruct)
+    """
+    size = len(matrix)
+    if size <= 1:
+        return 0, list(range(size))
+
+    masks = np.arange(1 << size)
+    popcount = np.zeros(1 << size, dtype=np.int64)
+    for bit in range(size):
+        popcount += (masks >> bit) & 1
+
+    # Masks grouped by number of nodes, and the row of each mask within its layer
+    layers = np.argsort(popcount, kind="stable")
+    layer_starts = np.concatenate(([0], np.cumsum(np.bincount(popcount))))
+    row = np.empty(1 << size, dtype=np.int64)
+    row[layers] = np.arange(1 << size) - layer_starts[popcount[layers]]
+
+    # Paths of a single node cost nothing
+    cost = np.full((size, size), UNREACHABLE, dtype=np.int64)
+    cost[row[1 << masks[:size]], masks[:size]] = 0
+    predecessors = []
+
+    for nodes in range(2, size + 1):
+        layer = layers[layer_starts[nodes] : layer_starts[nodes + 1]]
+        layer_cost = np.full((len(layer), size), UNREACHABLE, dtype=np.int64)
+        layer_predecessors = np.zeros((len(layer), size), dtype=np.int8) if reconstruct else None
+
+        for last in range(size):
+            rows = np.flatnonzero((layer >> last) & 1)
+            # Extend every path over the other nodes with the road to last; paths
+            # ending outside the previous mask are (about) UNREACHABLE already
+            candidates = cost[row[layer[rows] ^ (1 << last)]] + matrix[:, last]
+            best = candidates.argmin(axis=1)
+            shortest = candidates[np.arange(len(rows)), best]
+            layer_cost[rows, last] = np.where(shortest < UNREACHABLE // 2, shortest, UNREACHABLE)
+            if reconstruct:
+                layer_predecessors[rows, last] = best
+
+        cost = layer_cost
+        predecessors.append(layer_predecessors)
+
+    last = int(cost[0].argmin())
+    if cost[0, last] >= UNREACHABLE:
+        return None, []
+
+    distance = int(cost[0, last])
+    if not reconstruct:
+        return distance, []
+
+    path = [last]
+    mask = (1 << size) - 1
+    for layer_predecessors in reversed(predecessors):
+        previous = int(layer_predecessors[row[mask], last])
+        mask ^= 1 << last
+        last = previous
+        path.append(last)
+
+    return distance, path[::-1]
+
+
+def find_optimal_path(
+    cities: set[str], routes: dict[tuple[str, str], int], find_max: bool = False
+) -> tuple[int, list[str]]:
+    """
+    Find the optimal route that visits each city exactly once, and the cities along it.
+
+    The longest route is the shortest one with negated distances.
+
+    Args:
+        cities: Set of all city names
+        routes: Dict mapping city pairs to distances
+        find_max: If True, find longest route; if False, find shortest
+
+    Returns:
+        Tuple of (optimal distance, city names in order), (0, []) if there is no route
+    """
+    return _optimal_route(cities, routes, find_max, reconstruct=True)
 
 
 def find_optimal_route(
@@ -71,7 +177,7 @@ def find_optimal_route(
     """
     Find the optimal route that visits each city exactly once.
 
-    This is the Traveling Salesman Problem (TSP).
+    This is the shortest (or longest) Hamiltonian path, solved with Held-Karp.
 
     Args:
         cities: Set of all city names
@@ -79,42 +185,54 @@ def find_optimal_route(
         find_max: If True, find longest route; if False, find shortest
 
     Returns:
-        Optimal distance (shortest or longest based on find_max)
+        Optimal distance (shortest or longest based on find_max), 0 if there is no route
     """
-    if not cities:
-        return 0
+    return _optimal_route(cities, routes, find_max, reconstruct=False)[0]
+
 
-    optimal_distance = float("-inf") if find_max else float("inf")
-    comparison = max if find_max else min
+def _optimal_route(
+    cities: set[str], routes: dict[tuple[str, str], int], find_max: bool, reconstruct: bool
+) -> tuple[int, list[str]]:
+    names, matrix = distance_matrix(cities, routes)
+    if find_max:
+        matrix = np.where(matrix < UNREACHABLE, -matrix, UNREACHABLE)
 
-    for route in permutations(cities):
-        distance = calculate_route_distance(route, routes)
+    distance, path = held_karp(matrix, reconstruct)
+    if distance is None:
+        return 0, []
 
-        if distance is not None:
-            optimal_distance = comparison(optimal_distance, distance)
+    return (-distance if find_max else distance), [names[node] for node in path]
 
-    return (
-        int(optimal_distance)
-        if optimal_distance != float("inf") and optimal_distance != float("-inf")
-        else 0
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """Generate a random distance from 10 to 200 between every pair of size cities."""
+    cities = [f"City{index}" for index in range(size)]
+    return "\n".join(
+        f"{origin} to {destination} = {rng.randint(10, 200)}"
+        for origin, destination in combinations(cities, 2)
     )
 
 
-def part_one(data: list[str]) -> int:
+def parse_input(data: str) -> Routes:
+    """Parse the input into the set of cities and the distances between them."""
+    return prepare_routes(data.splitlines())
+
+
+def part_one(data: Routes) -> int:
     """Calculate the shortest route visiting all cities exactly once."""
-    cities, routes = prepare_routes(data)
+    cities, routes = data
     return find_optimal_route(cities, routes, find_max=False)
 
 
-def part_two(data: list[str]) -> int:
+def part_two(data: Routes) -> int:
     """Calculate the longest route visiting all cities exactly once."""
-    cities, routes = prepare_routes(data)
+    cities, routes = data
     return find_optimal_route(cities, routes, find_max=True)
 
 
 def solve():
     """Main solve function."""
-    data = read_lines(2015, 9)
+    data = parse_input(read_raw(2015, 9))
 
     print(f"Part 1: {part_one(data)}")
     print(f"Part 2: {part_two(data)}")
@@ -1,9 +1,26 @@
 """Advent of Code 2015 - Day 10: Elves Look, Elves Say"""
 
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
 from itertools import groupby
+from pathlib import Path
+
+import numpy as np
 
 PUZZLE_INPUT = 3113322113
 
+# How far ahead splitting a term is checked, in characters and in iterations
+SPLIT_PREFIX = 64
+SPLIT_STEPS = 32
+
+# Digits looked and said at a time when expanding terms directly
+CHUNK_SIZE = 1 << 16
+
+# Elements whose decay is remembered: the 92 common elements plus the transient ones
+# of a few starting terms
+DECAY_CACHE_SIZE = 4096
+
 
 def look_and_say(term: str) -> str:
     """
@@ -26,24 +43,241 @@ def look_and_say(term: str) -> str:
     return "".join(f"{sum(1 for _ in group)}{digit}" for digit, group in groupby(term))
 
 
-def part_one() -> int:
-    """Compute the 40th term in the look-and-say sequence starting from PUZZLE_INPUT."""
-    term = str(PUZZLE_INPUT)
+def splits_from(last_digit: str, right: str) -> bool:
+    """
+    Check whether right evolves independently of a term ending in last_digit.
 
-    for _ in range(40):
-        term = look_and_say(term)
+    The last digit of a term never changes, so a term splits in two for good as long as
+    the first digit of the right part never becomes that digit. Only a prefix of the right
+    part is followed, dropping its last run (which may continue past the prefix) every step;
+    the first digits of a term settle into a short cycle well within SPLIT_STEPS steps.
 
-    return len(term)
+    Args:
+        last_digit: Last digit of the left part
+        right: Right part of the term
+
+    Returns:
+        True if the term splits before right, False if it does not or cannot tell
+    """
+    prefix, complete = right[:SPLIT_PREFIX], len(right) <= SPLIT_PREFIX
 
+    for _ in range(SPLIT_STEPS):
+        if prefix[0] == last_digit:
+            return False
 
-def part_two() -> int:
-    """Compute the 50th term in the look-and-say sequence starting from PUZZLE_INPUT."""
-    term = str(PUZZLE_INPUT)
+        runs = [(digit, sum(1 for _ in group)) for digit, group in groupby(prefix)]
+        if not complete:
+            runs.pop()
+            if not runs:
+                return False
+
+        prefix = "".join(f"{count}{digit}" for digit, count in runs)
+        if len(prefix) > SPLIT_PREFIX:
+            prefix, complete = prefix[:SPLIT_PREFIX], False
+
+    return True
+
+
+def split_elements(term: str) -> list[str]:
+    """
+    Split a term into the parts that evolve independently of each other.
+
+    From common starting terms these are Conway's 92 audioactive elements after a few
+    iterations. Parts that never split, as with exotic starting terms, stay whole and are
+    simply expanded directly.
+
+    Args:
+        term: Sequence term
+
+    Returns:
+        Parts of the term, in order
+    """
+    elements = []
+    start = 0
+
+    for index in range(1, len(term)):
+        if term[index] != term[index - 1] and splits_from(term[index - 1], term[index:]):
+            elements.append(term[start:index])
+            start = index
 
-    for _ in range(50):
-        term = look_and_say(term)
+    if term:
+        elements.append(term[start:])
 
-    return len(term)
+    return elements
+
+
+@lru_cache(maxsize=DECAY_CACHE_SIZE)
+def decay(element: str) -> tuple[str, ...]:
+    """Elements the next term of an element splits into."""
+    return tuple(split_elements(look_and_say(element)))
+
+
+def look_and_say_length(term: str, iterations: int) -> int:
+    """
+    Compute the length of a term after some iterations without building it.
+
+    Only the number of copies of each element is kept, as every element evolves on its
+    own, so the work per iteration is bounded by the number of distinct elements rather
+    than the (exponentially growing) length of the term.
+
+    Args:
+        term: Starting term
+        iterations: Number of look-and-say steps
+
+    Returns:
+        Length of the term after the iterations
+    """
+    elements = Counter(split_elements(term))
+
+    for _ in range(iterations):
+        next_elements: Counter[str] = Counter()
+        for element, copies in elements.items():
+            for product in decay(element):
+                next_elements[product] += copies
+        elements = next_elements
+
+    return sum(len(element) * copies for element, copies in elements.items())
+
+
+def encode_runs(lengths: np.ndarray, digits: np.ndarray, buffer: np.ndarray) -> np.ndarray:
+    """
+    Write runs as look-and-say digits, into buffer unless a run is ten or more long.
+
+    Args:
+        lengths: Length of every run
+        digits: Digit of every run
+        buffer: Preallocated buffer for two digits per run
+
+    Returns:
+        Digits describing the runs
+    """
+    if lengths.max() <= 9:
+        size = 2 * len(lengths)
+        buffer[0:size:2] = lengths
+        buffer[1:size:2] = digits
+        return buffer[:size]
+
+    # Only exotic terms have runs of ten or more
+    text = "".join(f"{length}{digit}" for length, digit in zip(lengths, digits))
+    return np.frombuffer(text.encode(), dtype=np.uint8) - ord("0")
+
+
+def expand_chunks(chunks: Iterable[np.ndarray]) -> Iterator[np.ndarray]:
+    """
+    Look and say a term given in chunks of digits, yielding the next term in chunks.
+
+    Runs are found with NumPy a CHUNK_SIZE slice at a time, carrying the last run of
+    every slice over to the next one, and written into a single preallocated buffer:
+    a chunk yielded is only valid until the next one is requested.
+
+    Args:
+        chunks: Digits of the term (as values, not characters), in order
+
+    Yields:
+        Digits of the next term, in order
+    """
+    buffer = np.empty(2 * CHUNK_SIZE + 2, dtype=np.uint8)
+    carry_digit, carry_length = -1, 0
+
+    for chunk in chunks:
+        for start in range(0, len(chunk), CHUNK_SIZE):
+            piece = chunk[start : start + CHUNK_SIZE]
+            run_starts = np.concatenate(([0], np.flatnonzero(piece[1:] != piece[:-1]) + 1))
+            lengths = np.diff(run_starts, append=len(piece))
+            digits = piece[run_starts]
+
+            if digits[0] == carry_digit:
+                lengths[0] += carry_length
+            elif carry_length:
+                lengths = np.concatenate(([carry_length], lengths))
+                digits = np.concatenate(([carry_digit], digits))
+
+            # The last run may continue in the next slice
+            carry_digit, carry_length = int(digits[-1]), int(lengths[-1])
+            if len(lengths) > 1:
+                yield encode_runs(lengths[:-1], digits[:-1], buffer)
+
+    if carry_length:
+        yield encode_runs(np.array([carry_length]), np.array([carry_digit]), buffer)
+
+
+def look_and_say_chunks(term: str, iterations: int) -> Iterator[np.ndarray]:
+    """
+    Stream a term after some iterations in chunks of digits.
+
+    Every iteration is a generator consuming the chunks of the previous one, so memory
+    grows with the number of iterations rather than with the length of the term.
+
+    Args:
+        term: Starting term
+        iterations: Number of look-and-say steps
+
+    Returns:
+        Chunks of digits of the term after the iterations (as values), each valid until
+        the next one is requested
+    """
+    chunks: Iterator[np.ndarray] = iter([np.frombuffer(term.encode(), dtype=np.uint8) - ord("0")])
+
+    for _ in range(iterations):
+        chunks = expand_chunks(chunks)
+
+    return chunks
+
+
+def write_term(term: str, iterations: int, path: Path) -> int:
+    """
+    Stream a term after some iterations to a file.
+
+    Args:
+        term: Starting term
+        iterations: Number of look-and-say steps
+        path: File to write the digits to
+
+    Returns:
+        Number of digits written
+    """
+    written = 0
+
+    with path.open("wb") as file:
+        for chunk in look_and_say_chunks(term, iterations):
+            file.write((chunk + ord("0")).tobytes())
+            written += len(chunk)
+
+    return written
+
+
+def term_prefix(term: str, iterations: int, digits: int) -> str:
+    """
+    Compute the first digits of a term after some iterations.
+
+    Only as much of every iteration is expanded as the prefix needs.
+
+    Args:
+        term: Starting term
+        iterations: Number of look-and-say steps
+        digits: Number of leading digits wanted
+
+    Returns:
+        Up to digits leading digits of the term
+    """
+    prefix = bytearray()
+
+    for chunk in look_and_say_chunks(term, iterations):
+        if len(prefix) >= digits:
+            break
+        prefix += (chunk[: digits - len(prefix)] + ord("0")).tobytes()
+
+    return prefix.decode()
+
+
+def part_one() -> int:
+    """Compute the 40th term in the look-and-say sequence starting from PUZZLE_INPUT."""
+    return look_and_say_length(str(PUZZLE_INPUT), 40)
+
+
+def part_two() -> int:
+    """Compute the 50th term in the look-and-say sequence starting from PUZZLE_INPUT."""
+    return look_and_say_length(str(PUZZLE_INPUT), 50)
 
 
 def solve():
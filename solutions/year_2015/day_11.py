@@ -1,7 +1,22 @@
 """Advent of Code 2015 - Day 11: Corporate Policy"""
 
+from collections.abc import Iterator
+from functools import cache
+
 SANTAS_PASSWORD = "cqjxjnds"
 
+# Letters as numbers from 0 for 'a', leaving out 'i', 'o' and 'l'
+ALLOWED = [ord(letter) - ord("a") for letter in "abcdefghjkmnpqrstuvwxyz"]
+
+# Sentinels for a letter not seen yet (never part of a straight) and for the pairs found
+NO_LETTER = -10
+NO_PAIR = -1
+PAIRS_DONE = 26
+
+# The two previous letters, whether there is a straight yet and the letter of the only
+# pair found, NO_PAIR or PAIRS_DONE
+State = tuple[int, int, bool, int]
+
 
 def increment_password(pw: str) -> str:
     """
@@ -62,6 +77,89 @@ def is_valid_password(pw: str) -> bool:
     return True
 
 
+def password_to_number(pw: str) -> int:
+    """Read a password as a base-26 number, with 'a' as 0."""
+    number = 0
+    for letter in pw:
+        number = number * 26 + ord(letter) - ord("a")
+
+    return number
+
+
+def number_to_letters(number: int, length: int) -> list[int]:
+    """Write a number as the letters (0 for 'a') of a base-26 password of a given length."""
+    letters = []
+    for _ in range(length):
+        number, letter = divmod(number, 26)
+        letters.append(letter)
+
+    return letters[::-1]
+
+
+def next_state(state: State, letter: int) -> State:
+    """Account for one more letter in the rules still to satisfy."""
+    before_last, last, straight, pair = state
+    straight = straight or before_last + 2 == last + 1 == letter
+
+    if letter == last and pair != PAIRS_DONE and pair != letter:
+        pair = letter if pair == NO_PAIR else PAIRS_DONE
+
+    return last, letter, straight, pair
+
+
+@cache
+def can_complete(remaining: int, state: State) -> bool:
+    """Check whether some remaining allowed letters complete a straight and two pairs."""
+    _, _, straight, pair = state
+    if straight and pair == PAIRS_DONE:
+        return True
+    if not remaining:
+        return False
+
+    return any(can_complete(remaining - 1, next_state(state, letter)) for letter in ALLOWED)
+
+
+def valid_passwords(current_password: str) -> Iterator[str]:
+    """
+    Generate the valid passwords after the current one, in order.
+
+    Passwords are built letter by letter from the next base-26 number on, never using
+    'i', 'o' or 'l' and only choosing letters after which the straight and both pairs
+    can still be completed, so every prefix tried leads to a valid password.
+
+    Args:
+        current_password: Current password string
+
+    Yields:
+        Successive valid passwords of the same length
+    """
+    length = len(current_password)
+    start = password_to_number(current_password) + 1
+    if start >= 26**length:
+        return
+
+    lowest = number_to_letters(start, length)
+    letters = [0] * length
+
+    def search(position: int, state: State, bounded: bool) -> Iterator[str]:
+        if position == length:
+            yield "".join(chr(ord("a") + letter) for letter in letters)
+            return
+
+        # Until a letter is above the starting password, stay at or above its letters
+        floor = lowest[position] if bounded else 0
+        for letter in ALLOWED:
+            if letter < floor:
+                continue
+
+            letter_state = next_state(state, letter)
+            if can_complete(length - position - 1, letter_state):
+                letters[position] = letter
+                yield from search(position + 1, letter_state, bounded and letter == floor)
+
+    yield from search(0, (NO_LETTER, NO_LETTER, False, NO_PAIR), True)
+
+
 def find_next_password(current_password: str) -> str:
     """
     Find the next valid password according to specified rules.
@@ -72,12 +170,10 @@ def find_next_password(current_password: str) -> str:
     Returns:
         Next valid password string
     """
+    for password in valid_passwords(current_password):
+        return password
 
-    next_password = increment_password(current_password)
-    while not is_valid_password(next_password):
-        next_password = increment_password(next_password)
-
-    return next_password
+    raise ValueError(f"No valid password after {current_password!r}")
 
 
 def part_one() -> str:
@@ -86,8 +182,10 @@ def part_one() -> str:
 
 
 def part_two() -> str:
-    """Find the next valid password after the one found in part one."""
-    return find_next_password(part_one())
+    """Find the valid password after the one found in part one."""
+    passwords = valid_passwords(SANTAS_PASSWORD)
+    next(passwords)
+    return next(passwords)
 
 
 def solve():
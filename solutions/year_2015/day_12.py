@@ -1,37 +1,175 @@
 """Advent of Code 2015 - Day 12: JSAbacusFramework.io"""
 
 import json
-from typing import Any
+import re
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path
 
 from modules.utils.input_reader import read_raw
 
+# Characters read from a file at a time when streaming it
+CHUNK_SIZE = 1 << 20
 
-def extract_numbers(obj: Any, ignore_red: bool = False) -> list[int]:
+# The characters of a string between its quotes, with only the escapes JSON allows
+STRING_CHARACTERS = r'(?:[^"\\\x00-\x1f]|\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))*'
+# A token after optional whitespace: a string, a number, a literal or a punctuation mark
+TOKEN = re.compile(
+    rf'[ \t\n\r]*(?:("{STRING_CHARACTERS}")|(-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?)'
+    r"|true|false|null|([{}\[\]:,]))"
+)
+# The start of a token that the next chunk may still complete
+PARTIAL_TOKEN = re.compile(
+    r"[ \t\n\r]*(?:-|t(?:ru?)?|f(?:a(?:ls?)?)?|n(?:ul?)?"
+    rf'|"{STRING_CHARACTERS}(?:\\(?:u[0-9a-fA-F]{{0,3}})?)?)?'
+)
+
+CLOSING_BRACKETS = {"}": "{", "]": "["}
+
+# Brackets, numbers, literals and string values, as (kind, text) with the bracket itself
+# as the kind
+Token = tuple[str, str]
+
+
+def read_chunks(path: Path, size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Read a file a chunk at a time."""
+    with path.open() as file:
+        while chunk := file.read(size):
+            yield chunk
+
+
+def tokenize_json(chunks: Iterable[str]) -> Iterator[Token]:
     """
-    Recursively extract all numbers from a JSON structure.
+    Split a JSON document into its brackets, numbers, literals and string values as it
+    streams in.
+
+    Keys, colons and commas are checked against the JSON grammar but not passed
+    on. Only the brackets of the open arrays and objects are kept, so memory does not grow
+    with the size of the document.
 
     Args:
-        obj: JSON object (can be dict, list, int, str, etc.)
-        ignore_red: If True, skip dictionaries containing "red" as a value
+        chunks: The JSON document in consecutive pieces
 
-    Returns:
-        List of all integers found in the structure
-    """
-    if isinstance(obj, int):
-        return [obj]
+    Yields:
+        ("{", "{"), ("[", "["), ("}", "}"), ("]", "]"), ("number", text),
+        ("literal", text) and ("string", text) tokens, in document order
 
-    if isinstance(obj, list):
-        return [num for item in obj for num in extract_numbers(item, ignore_red)]
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    open_brackets = []
+    # What may come next: "value", "key", "colon", "next" (a comma or closing bracket
+    # after a value) or "end" after the whole document
+    expected = "value"
+    # Whether the innermost array or object was just opened and may close right away
+    empty = False
+    buffer = ""
+    # Position of the start of the buffer in the document
+    offset = 0
+    chunks = iter(chunks)
+    final = False
+
+    while not final:
+        chunk = next(chunks, None)
+        final = chunk is None
+        buffer += chunk or ""
+        position = 0
+
+        while match := TOKEN.match(buffer, position):
+            # A token near the end of the buffer may continue in the next chunk, even
+            # past characters that do not match yet, like "1" in "1e+"
+            if match.end() > len(buffer) - 3 and not final:
+                break
+            string, number, mark = match.groups()
+            token = match.group().lstrip(" \t\n\r")
+            token_start = offset + match.end() - len(token)
+
+            if string is not None and expected == "key":
+                expected = "colon"
+            elif mark == ":" and expected == "colon":
+                expected = "value"
+                empty = False
+            elif mark == "," and expected == "next":
+                expected = "key" if open_brackets[-1] == "{" else "value"
+            elif mark in CLOSING_BRACKETS and (
+                expected == "next" or (empty and expected in ("key", "value"))
+            ):
+                if CLOSING_BRACKETS[mark] != open_brackets[-1]:
+                    raise ValueError(f"Mismatched {mark!r} at character {token_start}")
+                open_brackets.pop()
+                yield mark, mark
+                expected = "next" if open_brackets else "end"
+                empty = False
+            elif mark in ("{", "[") and expected == "value":
+                open_brackets.append(mark)
+                yield mark, mark
+                expected = "key" if mark == "{" else "value"
+                empty = True
+            elif mark is None and expected == "value":
+                if string is not None:
+                    yield "string", string
+                elif number is not None:
+                    yield "number", number
+                else:
+                    yield "literal", token
+                expected = "next" if open_brackets else "end"
+                empty = False
+            else:
+                raise ValueError(f"Unexpected {token!r} at character {token_start}")
+
+            position = match.end()
+        else:
+            # Nothing matches, so unless the next chunk completes a token this is not JSON
+            rest = buffer[position:]
+            if rest.strip(" \t\n\r") and (final or not PARTIAL_TOKEN.fullmatch(rest)):
+                raise ValueError(f"Invalid JSON at character {offset + position}: {rest[:20]!r}")
+
+        offset += position
+        buffer = buffer[position:]
+
+    if expected != "end":
+        raise ValueError("Unterminated JSON document")
+
+
+def json_totals(tokens: Iterable[Token]) -> tuple[int, int]:
+    """
+    Sum all integers in a tokenized JSON document, with and without objects containing "red".
 
-    if isinstance(obj, dict):
-        # Skip this dict if it contains "red" and we're ignoring red
-        if ignore_red and "red" in obj.values():
-            return []
+    Only a stack with the partial sums of every open array or object is kept, so the
+    tokens can stream in and deep nesting cannot exhaust the recursion limit. Like
+    Python's bool, true counts as 1.
 
-        return [num for value in obj.values() for num in extract_numbers(value, ignore_red)]
+    Args:
+        tokens: The tokens of the document, as produced by tokenize_json
 
-    # Base case: not a number, list, or dict
-    return []
+    Returns:
+        Tuple of (sum of all integers, sum ignoring objects with a "red" value)
+    """
+    # Every frame is [is object, sum, sum without red, has a "red" value]; the bottom
+    # one collects the document itself
+    stack = [[False, 0, 0, False]]
+
+    for kind, text in tokens:
+        if kind == "number":
+            if text.lstrip("-").isdigit():
+                stack[-1][1] += int(text)
+                stack[-1][2] += int(text)
+        elif kind == "literal":
+            if text == "true":
+                stack[-1][1] += 1
+                stack[-1][2] += 1
+        elif kind == "string":
+            if stack[-1][0] and json.loads(text) == "red":
+                stack[-1][3] = True
+        elif kind in ("{", "["):
+            stack.append([kind == "{", 0, 0, False])
+        else:
+            is_object, total, kept, red = stack.pop()
+            stack[-1][1] += total
+            stack[-1][2] += 0 if is_object and red else kept
+
+    _, total, kept, _ = stack[0]
+    return total, kept
 
 
 def sum_json_numbers(data: str, ignore_red: bool = False) -> int:
@@ -45,28 +183,43 @@ def sum_json_numbers(data: str, ignore_red: bool = False) -> int:
     Returns:
         Sum of all numbers in the JSON structure
     """
-    json_data = json.loads(data)
-    numbers = extract_numbers(json_data, ignore_red)
-    return sum(numbers)
+    total, kept = json_totals(tokenize_json([data]))
+    return kept if ignore_red else total
+
+
+def json_file_totals(path: Path) -> tuple[int, int]:
+    """Sum all integers in a JSON file read a chunk at a time, with and without red objects."""
+    return json_totals(tokenize_json(read_chunks(path)))
+
+
+def parse_input(data: str) -> tuple[int, int]:
+    """Stream the JSON document once, summing it with and without objects containing "red"."""
+    return json_totals(tokenize_json([data]))
 
 
-def part_one(data: str) -> int:
+def part_one(data: tuple[int, int]) -> int:
     """Sum all numbers in the JSON document."""
-    return sum_json_numbers(data, ignore_red=False)
+    return data[0]
 
 
-def part_two(data: str) -> int:
+def part_two(data: tuple[int, int]) -> int:
     """Sum all numbers, ignoring objects with 'red' property."""
-    return sum_json_numbers(data, ignore_red=True)
+    return data[1]
 
 
 def solve():
     """Main solve function."""
-    data = read_raw(2015, 12)
+    data = parse_input(read_raw(2015, 12))
 
     print(f"Part 1: {part_one(data)}")
     print(f"Part 2: {part_two(data)}")
 
 
 if __name__ == "__main__":
-    solve()
+    # A path argument sums that file instead, streamed from disk for large exports
+    if len(sys.argv) > 1:
+        total, kept = json_file_totals(Path(sys.argv[1]))
+        print(f"Part 1: {total}")
+        print(f"Part 2: {kept}")
+    else:
+        solve()
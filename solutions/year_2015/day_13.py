@@ -1,8 +1,14 @@
 """Advent of Code 2015 - Day 13: Knights of the Dinner Table"""
 
-from itertools import permutations
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, repeat
 
-from modules.utils.input_reader import read_lines
+from modules.utils.input_reader import read_raw
+
+# Below this many guests a process pool costs more than the search itself
+PARALLEL_MIN_GUESTS = 11
 
 
 def find_happiness(data: list[str], include_me: bool = False) -> dict[tuple[str, str], int]:
@@ -28,59 +34,161 @@ def find_happiness(data: list[str], include_me: bool = False) -> dict[tuple[str,
         happiness[(person_a, person_b)] = amount
 
     if include_me:
-        people = set()
-        for person_a, person_b in happiness.keys():
-            people.add(person_a)
-            people.add(person_b)
-        for person in people:
-            happiness[("Me", person)] = 0
-            happiness[(person, "Me")] = 0
+        happiness = add_me(happiness)
 
     return happiness
 
 
-def find_optimal_arrangement(happiness: dict[tuple[str, str], int]) -> int:
+def find_people(happiness: dict[tuple[str, str], int]) -> set[str]:
     """
-    Find the seating arrangement that maximizes total happiness.
+    Collect everyone mentioned in the happiness values.
     Args:
         happiness: Dictionary mapping (person_a, person_b) to happiness value
     Returns:
-        Maximum total happiness for any arrangement
+        Set of the names of all guests
     """
     people = set()
-    for person_a, person_b in happiness.keys():
+    for person_a, person_b in happiness:
         people.add(person_a)
         people.add(person_b)
 
-    max_happiness = float("-inf")
-    for arrangement in permutations(people):
-        total_happiness = 0
-        for index in range(len(arrangement)):
-            person_a = arrangement[index]
-            person_b = arrangement[(index + 1) % len(arrangement)]
-            total_happiness += happiness.get((person_a, person_b), 0)
-            total_happiness += happiness.get((person_b, person_a), 0)
-        max_happiness = max(max_happiness, total_happiness)
+    return people
+
+
+def add_me(happiness: dict[tuple[str, str], int]) -> dict[tuple[str, str], int]:
+    """
+    Return a copy of the happiness values with a neutral "Me" seated among the guests.
+    Args:
+        happiness: Dictionary mapping (person_a, person_b) to happiness value
+    Returns:
+        Dictionary mapping (person_a, person_b) to happiness value, including "Me"
+    """
+    people = find_people(happiness)
+    happiness = dict(happiness)
+    for person in people:
+        happiness[("Me", person)] = 0
+        happiness[(person, "Me")] = 0
+
+    return happiness
+
+
+def pairwise_matrix(happiness: dict[tuple[str, str], int]) -> list[list[int]]:
+    """
+    Build the symmetric matrix of the happiness two guests get from sitting together.
+    Args:
+        happiness: Dictionary mapping (person_a, person_b) to happiness value
+    Returns:
+        Matrix indexed by guest (sorted by name) with the happiness of both guests summed
+    """
+    guests = sorted(find_people(happiness))
+    return [
+        [
+            happiness.get((person_a, person_b), 0) + happiness.get((person_b, person_a), 0)
+            if person_a != person_b
+            else 0
+            for person_b in guests
+        ]
+        for person_a in guests
+    ]
+
+
+def best_middle(matrix: list[list[int]], first: int, last: int) -> int:
+    """
+    Find the best arrangement with guest 0 seated between first and last.
+    Args:
+        matrix: Symmetric pairwise happiness matrix
+        first: Guest to the right of guest 0, where the chain of other guests starts
+        last: Guest to the left of guest 0, where the chain of other guests ends
+    Returns:
+        Maximum total happiness of the table with those neighbours for guest 0
+    """
+    middle = [guest for guest in range(1, len(matrix)) if guest not in (first, last)]
+    best = float("-inf")
+
+    def extend(previous: int, total: int, remaining: int) -> None:
+        nonlocal best
+        if not remaining:
+            best = max(best, total + matrix[previous][last])
+            return
+
+        row = matrix[previous]
+        for position, guest in enumerate(middle):
+            if remaining >> position & 1:
+                extend(guest, total + row[guest], remaining & ~(1 << position))
+
+    extend(first, matrix[0][first] + matrix[last][0], (1 << len(middle)) - 1)
+    return int(best)
+
+
+def find_optimal_arrangement(happiness: dict[tuple[str, str], int], workers: int | None = 1) -> int:
+    """
+    Find the seating arrangement that maximizes total happiness.
+
+    The table is round and arrangements read the same both ways, so guest 0 stays
+    seated and only arrangements whose first neighbour of guest 0 comes before its last
+    one are scored: (n-1)!/2 instead of n!. Every pair of neighbours of guest 0 is a
+    separate shard, searched on a process pool from PARALLEL_MIN_GUESTS guests on.
+    Args:
+        happiness: Dictionary mapping (person_a, person_b) to happiness value
+        workers: Number of worker processes, None for one per CPU
+    Returns:
+        Maximum total happiness for any arrangement
+    """
+    matrix = pairwise_matrix(happiness)
+    size = len(matrix)
+
+    if size <= 2:
+        # Two guests sit next to each other on both sides
+        return 2 * matrix[0][1] if size == 2 else 0
+
+    neighbours = list(combinations(range(1, size), 2))
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or size < PARALLEL_MIN_GUESTS:
+        return max(best_middle(matrix, first, last) for first, last in neighbours)
+
+    with ProcessPoolExecutor(workers) as executor:
+        return max(
+            executor.map(
+                best_middle,
+                repeat(matrix),
+                *zip(*neighbours),
+                chunksize=max(1, len(neighbours) // (4 * workers)),
+            )
+        )
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """Generate a random happiness change for every ordered pair of size guests."""
+    guests = [f"Guest{index}" for index in range(size)]
+    return "\n".join(
+        f"{person_a} would {rng.choice(['gain', 'lose'])} {rng.randint(1, 100)} happiness units "
+        f"by sitting next to {person_b}."
+        for person_a in guests
+        for person_b in guests
+        if person_a != person_b
+    )
+
 
-    return int(max_happiness)
+def parse_input(data: str) -> dict[tuple[str, str], int]:
+    """Parse the input into the happiness values between the guests."""
+    return find_happiness(data.splitlines(), include_me=False)
 
 
-def part_one(data: list[str]) -> int:
+def part_one(data: dict[tuple[str, str], int]) -> int:
     """Find the optimal seating arrangement without including myself."""
-    happiness = find_happiness(data, include_me=False)
-    return find_optimal_arrangement(happiness)
+    return find_optimal_arrangement(data, workers=None)
 
 
-def part_two(data: list[str]) -> int:
+def part_two(data: dict[tuple[str, str], int]) -> int:
     """Include myself in the happiness calculations and find the optimal arrangement."""
-    happiness = find_happiness(data, include_me=True)
-    return find_optimal_arrangement(happiness)
+    return find_optimal_arrangement(add_me(data), workers=None)
 
 
 def solve():
     """Main solve function."""
 
-    data = read_lines(2015, 13)
+    data = parse_input(read_raw(2015, 13))
     print("Part One:", part_one(data))
     print("Part Two:", part_two(data))
 
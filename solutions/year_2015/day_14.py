@@ -1,8 +1,17 @@
 """Advent of Code 2015, Day 14: Reindeer Olympics"""
 
-from modules.utils.input_reader import read_lines
+import heapq
+import random
+from fractions import Fraction
+from math import floor, lcm
+
+import numpy as np
+
+from modules.utils.input_reader import read_raw
 
 RACE_DURATION = 2503
+# Distances computed at once when following a race second by second
+PER_SECOND_CELLS = 1 << 20
 
 
 def parse_reindeer(line: str) -> tuple[int, int, int]:
@@ -26,48 +35,216 @@ def calculate_reindeer_distance(speed: int, fly_time: int, rest_time: int, durat
     return distance
 
 
-def part_one(data: list[str]) -> int:
-    """Find the maximum distance traveled by any reindeer after the race duration."""
-
-    reindeer_distances = {}
-
-    for reindeer in data:
-        speed, fly_time, rest_time = parse_reindeer(reindeer)
+def award_interval(
+    points: np.ndarray, distances: np.ndarray, speeds: np.ndarray, start: int, stop: int
+) -> None:
+    """Award the lead points for the seconds start + 1 to stop, while no reindeer changes pace.
+
+    Only the seconds where the lead can change are looked at: after every such second, the
+    fastest leaders stay ahead alone until the first faster reindeer catches up.
+    """
+    second = start
+
+    while second < stop:
+        second += 1
+        current = distances + speeds * (second - start)
+        lead = current.max()
+        leaders = np.flatnonzero(current == lead)
+        points[leaders] += 1
+
+        lead_speed = speeds[leaders].max()
+        faster = speeds > lead_speed
+        until = stop + 1
+        if faster.any():
+            gaps = lead - current[faster]
+            catch_up = (gaps - 1) // (speeds[faster] - lead_speed) + 1
+            until = min(until, second + int(catch_up.min()))
+
+        points[leaders[speeds[leaders] == lead_speed]] += until - 1 - second
+        second = until - 1
+
+
+def simulate_race(
+    reindeer: list[tuple[int, int, int]],
+    start: int,
+    stop: int,
+    last_chances: list[int | None] | None = None,
+) -> np.ndarray:
+    """Points scored by every reindeer in the seconds start + 1 to stop.
+
+    The race only advances from one change between flying and resting to the next. With
+    last_chances, reindeer drop out once past the last second they could lead (None for
+    reindeer that always can).
+    """
+    count = len(reindeer)
+    points = np.zeros(count, dtype=np.int64)
+    distances = np.array(
+        [calculate_reindeer_distance(*stats, start) for stats in reindeer], dtype=np.int64
+    )
+    speeds = np.zeros(count, dtype=np.int64)
+    flying = [False] * count
+    changes = []
+
+    for index, (speed, fly_time, rest_time) in enumerate(reindeer):
+        phase = start % (fly_time + rest_time)
+        flying[index] = phase < fly_time
+        if flying[index]:
+            speeds[index] = speed
+            changes.append((start + fly_time - phase, index))
+        else:
+            changes.append((start + fly_time + rest_time - phase, index))
+    heapq.heapify(changes)
+
+    last_chances = last_chances or [None] * count
+    dropouts = sorted(
+        (last_chance, index)
+        for index, last_chance in enumerate(last_chances)
+        if last_chance is not None
+    )
+    dropouts.reverse()
+    racing = [True] * count
+    second = start
+
+    while second < stop:
+        next_second = min(changes[0][0], stop) if changes else stop
+        award_interval(points, distances, speeds, second, next_second)
+        distances += speeds * (next_second - second)
+        second = next_second
+
+        while dropouts and dropouts[-1][0] < second:
+            # Too far behind to ever lead again
+            _, index = dropouts.pop()
+            racing[index] = False
+            distances[index] = -1
+            speeds[index] = 0
+
+        while changes and changes[0][0] == second:
+            _, index = heapq.heappop(changes)
+            if not racing[index]:
+                continue
+
+            speed, fly_time, rest_time = reindeer[index]
+            flying[index] = not flying[index]
+            speeds[index] = speed if flying[index] else 0
+            heapq.heappush(changes, (second + (fly_time if flying[index] else rest_time), index))
+
+    return points
+
+
+def race_points(reindeer: list[tuple[int, int, int]], duration: int) -> list[int]:
+    """
+    Points of every reindeer after a race, scored by the lead every second.
+
+    A reindeer flies at its average speed on average, and at most speed * fly * rest /
+    cycle ahead of it. So once a reindeer slower on average than the fastest ones is that
+    far behind, it never leads again. From then on only the fastest ones race, and they
+    repeat the same pattern every least common multiple of their cycles: that period is
+    simulated once and its points multiplied.
+
+    Args:
+        reindeer: (speed, fly time, rest time) of every reindeer
+        duration: Length of the race in seconds
+
+    Returns:
+        Points of every reindeer
+    """
+    if not reindeer or duration <= 0:
+        return [0] * len(reindeer)
+
+    averages = [Fraction(speed * fly, fly + rest) for speed, fly, rest in reindeer]
+    fastest = max(averages)
+    last_chances = [
+        None
+        if average == fastest
+        else floor(Fraction(speed * fly * rest, fly + rest) / (fastest - average))
+        for (speed, fly, rest), average in zip(reindeer, averages)
+    ]
+    settled = min(max((chance or 0 for chance in last_chances), default=0), duration)
+    points = simulate_race(reindeer, 0, settled, last_chances)
+
+    front = [index for index, chance in enumerate(last_chances) if chance is None]
+    remaining = duration - settled
+
+    if len(front) == 1:
+        points[front[0]] += remaining
+    elif remaining:
+        front_reindeer = [reindeer[index] for index in front]
+        period = lcm(*(fly + rest for _, fly, rest in front_reindeer))
+        repeats, remaining = divmod(remaining, period)
+
+        if repeats:
+            points[front] += repeats * simulate_race(front_reindeer, settled, settled + period)
+        points[front] += simulate_race(front_reindeer, settled, settled + remaining)
+
+    return points.tolist()
+
+
+def race_points_per_second(
+    reindeer: list[tuple[int, int, int]], duration: int, cells: int = PER_SECOND_CELLS
+) -> list[int]:
+    """
+    Points of every reindeer after a race, computing every distance every second.
+
+    The distances of all reindeer are computed for a block of seconds at a time, about
+    cells of them per block. Slow, but a direct cross-check of race_points.
+
+    Args:
+        reindeer: (speed, fly time, rest time) of every reindeer
+        duration: Length of the race in seconds
+        cells: Distances computed at once
+
+    Returns:
+        Points of every reindeer
+    """
+    speed, fly, rest = np.array(reindeer, dtype=np.int64).reshape(-1, 3).T
+    cycle = fly + rest
+    points = np.zeros(len(reindeer), dtype=np.int64)
+    block = max(1, cells // max(1, len(reindeer)))
+
+    for start in range(1, duration + 1, block):
+        seconds = np.arange(start, min(start + block, duration + 1), dtype=np.int64)[:, None]
+        distances = speed * fly * (seconds // cycle) + speed * np.minimum(seconds % cycle, fly)
+        points += (distances == distances.max(axis=1, keepdims=True)).sum(axis=0)
+
+    return points.tolist()
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """Generate size reindeer with random speeds, flight times and rest times."""
+    return "\n".join(
+        f"Reindeer{index} can fly {rng.randint(5, 25)} km/s for {rng.randint(3, 15)} seconds, "
+        f"but then must rest for {rng.randint(20, 160)} seconds."
+        for index in range(size)
+    )
+
 
-        distance = calculate_reindeer_distance(speed, fly_time, rest_time, RACE_DURATION)
+def parse_input(data: str) -> list[tuple[int, int, int]]:
+    """Parse every reindeer into its (speed, fly time, rest time)."""
+    return [parse_reindeer(line) for line in data.splitlines()]
 
-        reindeer_distances[reindeer] = distance
 
-    return max(reindeer_distances.values())
+def part_one(data: list[tuple[int, int, int]]) -> int:
+    """Find the maximum distance traveled by any reindeer after the race duration."""
 
+    reindeer_distances = []
 
-def part_two(data: list[str]) -> int:
-    """Calculate the maximum points earned by any reindeer using the lead scoring system."""
-    reindeer_stats = []
+    for speed, fly_time, rest_time in data:
+        distance = calculate_reindeer_distance(speed, fly_time, rest_time, RACE_DURATION)
 
-    for reindeer in data:
-        speed, fly_time, rest_time = parse_reindeer(reindeer)
-        reindeer_stats.append((speed, fly_time, rest_time))
+        reindeer_distances.append(distance)
 
-    reindeer_points = [0] * len(reindeer_stats)
-    reindeer_distances = [0] * len(reindeer_stats)
+    return max(reindeer_distances)
 
-    for second in range(1, RACE_DURATION + 1):
-        for i, (speed, fly_time, rest_time) in enumerate(reindeer_stats):
-            distance = calculate_reindeer_distance(speed, fly_time, rest_time, second)
-            reindeer_distances[i] = distance
-        max_distance = max(reindeer_distances)
-        for i, distance in enumerate(reindeer_distances):
-            if distance == max_distance:
-                reindeer_points[i] += 1
 
-    return max(reindeer_points)
+def part_two(data: list[tuple[int, int, int]]) -> int:
+    """Calculate the maximum points earned by any reindeer using the lead scoring system."""
+    return max(race_points(data, RACE_DURATION))
 
 
 def solve():
     """Main solve function."""
 
-    data = read_lines(2015, 14)
+    data = parse_input(read_raw(2015, 14))
     print("Part One:", part_one(data))
     print("Part Two:", part_two(data))
 
@@ -1,9 +1,22 @@
 """Advent of Code 2015, Day 15: Science for Hungry People"""
 
-from modules.utils.input_reader import read_lines
+from collections.abc import Iterator
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from modules.utils.input_reader import read_raw
 
 AVAILABLE_TEASPOONS = 100
 CALORIE_TARGET = 500
+DISTRIBUTION_CHUNK_SIZE = 1 << 16
+# Distributions to enumerate at most before branch and bound takes over
+ENUMERATION_LIMIT = 1 << 24
+BOUND_STEPS = 16
+BOUND_STEP = 0.75
+BOUND_DECAY = 0.75
+LINE_SEARCH_STEPS = 16
 
 
 def parse_ingredients(line: str) -> tuple[str, list[int]]:
@@ -29,9 +42,10 @@ def calculate_ingredient_score(
     totals = [0, 0, 0, 0, 0]
 
     property_count = len(totals)
+    ingredient_properties = list(ingredients.values())
 
     for idx, amount in enumerate(amounts):
-        ingredient = list(ingredients.values())[idx]
+        ingredient = ingredient_properties[idx]
         for prop_idx in range(property_count):
             totals[prop_idx] += ingredient[prop_idx] * amount
 
@@ -61,15 +75,10 @@ def generate_distributions(total: int, num_ingredients: int):
             yield (first_amount,) + rest
 
 
-def find_best_cookie_score(include_calories: bool = False) -> int:
+def find_best_cookie_score(
+    ingredients: dict[str, list[int]], include_calories: bool = False
+) -> int:
     """Find the best possible cookie score given ingredient constraints."""
-    data = read_lines(2015, 15)
-
-    ingredients = {}
-    for line in data:
-        name, properties = parse_ingredients(line)
-        ingredients[name] = properties
-
     num_ingredients = len(ingredients)
     max_score = 0
 
@@ -82,33 +91,393 @@ def find_best_cookie_score(include_calories: bool = False) -> int:
     return max_score
 
 
-def part_one(data: list[str]) -> int:
-    """Find the best cookie score without calorie constraints."""
-    ingredients = {}
+def ingredient_matrix(ingredients: dict[str, list[int]]) -> np.ndarray:
+    """Stack the properties of the ingredients into a matrix, one row per ingredient."""
+    return np.array(list(ingredients.values()), dtype=np.int64)
 
-    for line in data:
-        name, properties = parse_ingredients(line)
-        ingredients[name] = properties
 
-    return find_best_cookie_score(include_calories=False)
+def tail_distributions(total: int, count: int) -> np.ndarray:
+    """All ways to distribute total among count (at most 3) ingredients, one per row."""
+    if count == 1:
+        return np.array([[total]], dtype=np.int64)
+    if count == 2:
+        first = np.arange(total + 1, dtype=np.int64)
+        return np.column_stack((first, total - first))
 
+    # Pairs first <= second split total into first, second - first and total - second
+    first, second = np.triu_indices(total + 1)
+    return np.column_stack((first, second - first, total - second)).astype(np.int64)
 
-def part_two(data: list[str]) -> int:
-    """Find the best cookie score for combinations that have exactly 500 calories."""
 
+def distribution_chunks(
+    total: int, num_ingredients: int, chunk_size: int = DISTRIBUTION_CHUNK_SIZE
+) -> Iterator[np.ndarray]:
+    """Generate all possible ways to distribute total among num_ingredients in chunks.
+
+    The amounts of all but the last three ingredients are enumerated one by one, the
+    last three as a whole block of rows at once. Yields arrays of about chunk_size rows
+    (more if a single block is larger) of num_ingredients columns summing to total.
+    """
+    tail_count = min(num_ingredients, 3)
+    # Tail blocks by the teaspoons left for them, built on first use
+    tails: dict[int, np.ndarray] = {}
+    blocks = []
+    rows = 0
+
+    # The last amount of every prefix is what is left for the tail
+    for prefix in generate_distributions(total, num_ingredients - tail_count + 1):
+        if prefix[-1] not in tails:
+            tails[prefix[-1]] = tail_distributions(prefix[-1], tail_count)
+        tail = tails[prefix[-1]]
+        head = np.broadcast_to(np.array(prefix[:-1], dtype=np.int64), (len(tail), len(prefix) - 1))
+        blocks.append(np.hstack((head, tail)))
+        rows += len(tail)
+
+        if rows >= chunk_size:
+            yield np.concatenate(blocks)
+            blocks = []
+            rows = 0
+
+    if blocks:
+        yield np.concatenate(blocks)
+
+
+def score_dtype(ingredients: np.ndarray, teaspoons: int) -> type:
+    """Type holding exact scores: int64, or Python integers once products could overflow it."""
+    largest_total = teaspoons * max(1, int(np.abs(ingredients[:, :-1]).max(initial=0)))
+    return np.int64 if largest_total ** (ingredients.shape[1] - 1) < 2**63 else object
+
+
+def distribution_scores(
+    ingredients: np.ndarray, distributions: np.ndarray, dtype: type
+) -> tuple[np.ndarray, np.ndarray]:
+    """Property totals and scores of a chunk of distributions, from one matrix product.
+
+    The last property is calories and the others are multiplied into the score.
+    """
+    totals = distributions @ ingredients
+    scores = np.clip(totals[:, :-1], 0, None).astype(dtype, copy=False).prod(axis=1)
+    return totals, scores
+
+
+def best_cookie_scores(
+    ingredients: np.ndarray,
+    teaspoons: int = AVAILABLE_TEASPOONS,
+    calorie_target: int = CALORIE_TARGET,
+) -> tuple[int, int]:
+    """Find the best cookie score, and the best one with exactly calorie_target calories.
+
+    Both come out of one pass over every distribution.
+    """
+    dtype = score_dtype(ingredients, teaspoons)
+    best_score = 0
+    best_on_target = 0
+
+    for distributions in distribution_chunks(teaspoons, len(ingredients)):
+        totals, scores = distribution_scores(ingredients, distributions, dtype)
+        on_target = scores[totals[:, -1] == calorie_target]
+
+        best_score = max(best_score, int(scores.max()))
+        if len(on_target):
+            best_on_target = max(best_on_target, int(on_target.max()))
+
+    return best_score, best_on_target
+
+
+def vertex_lines(
+    ingredients: np.ndarray, remaining: int, calories_left: int | None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+    """What the teaspoons after the next ingredient add at the extreme allocations.
+
+    Every linear objective over the ways to spend those teaspoons is largest at one of
+    these: all of them on a single ingredient, or with a calorie target, also on two
+    ingredients whose calories average out to the target. With a teaspoons of the next
+    ingredient, every extreme allocation adds base + a * slope, a line in a.
+
+    Args:
+        ingredients: Properties (calories last) of the next ingredient and those after it
+        remaining: Teaspoons left before the next ingredient
+        calories_left: Calories still to add before the next ingredient, None without target
+
+    Returns:
+        Tuple of (base, slope) shaped (extreme allocations, properties) and, with a
+        calorie target, whether each extreme allocation hits it for every amount of the
+        next ingredient, shaped (remaining + 1, extreme allocations)
+    """
+    properties = ingredients[1:, :-1].astype(float)
+    calories, next_calories = ingredients[1:, -1], ingredients[0, -1]
+    base, slope = remaining * properties, -properties
+
+    if calories_left is None:
+        return base, slope, None
+
+    amounts = np.arange(remaining + 1)[:, None]
+    valid = calories * (remaining - amounts) == calories_left - next_calories * amounts
+
+    pairs = np.array(list(combinations(range(len(calories)), 2))).reshape(-1, 2)
+    pairs = pairs[calories[pairs[:, 0]] != calories[pairs[:, 1]]]
+    first, second = pairs[:, 0], pairs[:, 1]
+    difference = calories[first] - calories[second]
+    # Teaspoons of first (offset + a * rate) so that the two together hit the target
+    offset = (calories_left - calories[second] * remaining) / difference
+    rate = (calories[second] - next_calories) / difference
+    contrast = properties[first] - properties[second]
+    split = offset + amounts * rate
+
+    base = np.concatenate([base, offset[:, None] * contrast + remaining * properties[second]])
+    slope = np.concatenate([slope, rate[:, None] * contrast - properties[second]])
+    valid = np.concatenate([valid, (split >= 0) & (split <= remaining - amounts)], axis=1)
+    return base, slope, valid
+
+
+def weighted_bounds(
+    extremes: np.ndarray, valid: np.ndarray, weights: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """AM-GM bounds on the score for one set of positive property weights per amount.
+
+    Args:
+        extremes: Totals at the extreme allocations, shaped (amounts, allocations, properties)
+        valid: Whether each extreme allocation hits the calorie target, per amount
+        weights: Property weights per amount
+
+    Returns:
+        Tuple of (bound, weighted sum of every valid extreme allocation, the largest one)
+    """
+    count = extremes.shape[2]
+    sums = np.where(valid, np.einsum("rvp,rp->rv", extremes, weights), -np.inf)
+    maximising = sums.argmax(axis=1)
+    total = np.clip(sums[np.arange(len(sums)), maximising], 0, None)
+    return (total / count) ** count / weights.prod(axis=1), sums, maximising
+
+
+def log_rising(
+    point: np.ndarray, direction: np.ndarray, shift: np.ndarray, floor: np.ndarray
+) -> np.ndarray:
+    """Whether the sum of log totals still grows after moving shift along direction."""
+    moved = np.maximum(point + shift[:, None] * direction, floor)
+    return (direction / moved).sum(axis=1) > 0
+
+
+def score_bounds(
+    ingredients: np.ndarray,
+    totals: np.ndarray,
+    remaining: int,
+    calories_left: int | None,
+    threshold: float = 0,
+) -> np.ndarray:
+    """Upper bounds on the best score reachable after every amount of the next ingredient.
+
+    Every property total is bounded on its own by its best extreme allocation. By AM-GM,
+    the product of the totals is also at most (sum of w * total / count)^count / product
+    of w for any positive weights w, with the weighted sum bounded the same way. The
+    bound is tightest for w = 1 / totals at the best mix of extreme allocations, which
+    pairwise Frank-Wolfe steps close in on. Mixes with a total near zero make poor
+    weights, so subgradient steps on a second set of weights run alongside. Both stop
+    after BOUND_STEPS, or once every bound is down to threshold.
+
+    Args:
+        ingredients: Properties (calories last) of the next ingredient and those after it
+        totals: Property totals (without calories) so far
+        remaining: Teaspoons left before the next ingredient
+        calories_left: Calories still to add before the next ingredient, None without target
+        threshold: Score that bounds need not go below, like the best one so far
+
+    Returns:
+        Bound on the score per amount of the next ingredient
+    """
+    base, slope, valid = vertex_lines(ingredients, remaining, calories_left)
+    # The extreme allocations are lines in the amount, starting from the partial totals
+    amounts = np.arange(remaining + 1, dtype=float)
+    extremes = totals + base + amounts[:, None, None] * (ingredients[0, :-1] + slope)
+    if valid is None:
+        valid = np.ones(extremes.shape[:2], dtype=bool)
+
+    best_extremes = np.where(valid[:, :, None], extremes, -np.inf).argmax(axis=1)
+    limits = np.take_along_axis(extremes, best_extremes[:, None], axis=1)[:, 0]
+    limits = np.where(valid.any(axis=1)[:, None], np.floor(limits + 1e-9), -np.inf)
+    bounds = np.clip(limits, 0, None).prod(axis=1)
+
+    count = totals.shape[0]
+    if not count:
+        return bounds
+
+    # Only amounts whose bound is still above threshold take further steps
+    active = np.flatnonzero(bounds > threshold)
+    extremes, valid, limits = extremes[active], valid[active], limits[active]
+    floor = 1e-9 * np.maximum(limits, 1)
+    log_weights = -np.log(np.maximum(limits, 1))
+    # Start from an even mix of the extreme allocations best for each property
+    mix = np.zeros(valid.shape)
+    for column in best_extremes[active].T:
+        mix[np.arange(len(active)), column] += 1 / count
+
+    for step in range(BOUND_STEPS):
+        if not len(active):
+            break
+
+        rows = np.arange(len(active))
+        weights = np.exp(log_weights)
+        bound, sums, maximising = weighted_bounds(extremes, valid, weights)
+        bounds[active] = np.minimum(bounds[active], bound)
+
+        # Shift weight from the properties the maximising allocation favours most
+        chosen = extremes[rows, maximising]
+        shares = weights * chosen / np.maximum(sums[rows, maximising], 1)[:, None]
+        log_weights -= BOUND_STEP * BOUND_DECAY**step * np.clip(count * shares - 1, -1, 1)
+
+        point = np.einsum("rv,rvp->rp", mix, extremes)
+        bound, sums, toward = weighted_bounds(extremes, valid, 1 / np.maximum(point, floor))
+        bounds[active] = np.minimum(bounds[active], bound)
+
+        # Move mix from the worst extreme allocation in it to the best one, as far as
+        # the sum of log totals keeps growing
+        away = np.where(mix > 0, sums, np.inf).argmin(axis=1)
+        direction = extremes[rows, toward] - extremes[rows, away]
+        low, high = np.zeros(len(active)), mix[rows, away]
+        # Dropping the worst extreme allocation entirely is the common case
+        shift = np.where(log_rising(point, direction, high, floor), high, 0)
+        for _ in range(LINE_SEARCH_STEPS):
+            middle = (low + high) / 2
+            up = log_rising(point, direction, middle, floor)
+            low, high = np.where(up, middle, low), np.where(up, high, middle)
+        shift = np.where(shift > 0, shift, low)
+        mix[rows, toward] += shift
+        mix[rows, away] -= shift
+
+        keep = bounds[active] > threshold
+        active, extremes, valid = active[keep], extremes[keep], valid[keep]
+        mix, floor, log_weights = mix[keep], floor[keep], log_weights[keep]
+
+    return bounds
+
+
+def optimize_cookie(
+    ingredients: np.ndarray,
+    teaspoons: int = AVAILABLE_TEASPOONS,
+    calorie_target: int | None = None,
+) -> tuple[int, int]:
+    """Find the best cookie score exactly with branch and bound.
+
+    Ingredients are allocated one at a time. A partial allocation is only explored if
+    its score bound (see score_bounds) beats the best score so far, most promising
+    allocations first. The last ingredient takes the teaspoons left, and with a calorie
+    target, the one before it is solved from the calorie equation instead of branched on.
+
+    Args:
+        ingredients: Matrix of ingredient properties, calories last
+        teaspoons: Number of teaspoons to distribute
+        calorie_target: Exact number of calories required, None for any
+
+    Returns:
+        Tuple of (best score, number of search nodes explored)
+    """
+    count = len(ingredients)
+    if count == 0:
+        return 0, 0
+
+    exact = score_dtype(ingredients, teaspoons)
+    best = 0
+    explored = 0
+
+    def score_leaves(totals: np.ndarray) -> None:
+        nonlocal best
+        if len(totals):
+            best = max(best, int(np.clip(totals, 0, None).astype(exact).prod(axis=1).max()))
+
+    def search(depth: int, totals: np.ndarray, remaining: int, calories_left: int) -> None:
+        nonlocal explored
+        explored += 1
+        ingredient = ingredients[depth, :-1]
+
+        if depth + 1 == count:
+            if calorie_target is None or ingredients[depth, -1] * remaining == calories_left:
+                score_leaves((totals + remaining * ingredient)[None])
+            return
+
+        if depth + 2 == count:
+            amounts = np.arange(remaining + 1)
+            last = ingredients[depth + 1, :-1]
+            if calorie_target is not None:
+                calories, last_calories = ingredients[depth, -1], ingredients[depth + 1, -1]
+                if calories != last_calories:
+                    amount, mismatch = divmod(
+                        calories_left - last_calories * remaining, calories - last_calories
+                    )
+                    amounts = amounts[amounts == amount] if not mismatch else amounts[:0]
+                elif calories * remaining != calories_left:
+                    amounts = amounts[:0]
+            score_leaves(
+                totals + amounts[:, None] * ingredient + (remaining - amounts)[:, None] * last
+            )
+            return
+
+        bounds = score_bounds(
+            ingredients[depth:],
+            totals,
+            remaining,
+            None if calorie_target is None else calories_left,
+            best,
+        )
+
+        for child in np.argsort(-bounds, kind="stable").tolist():
+            # Float bounds are a hair generous so rounding never prunes the optimum
+            if bounds[child] * (1 + 1e-9) <= best:
+                break
+            search(
+                depth + 1,
+                totals + child * ingredient,
+                remaining - child,
+                calories_left - child * int(ingredients[depth, -1]),
+            )
+
+    search(0, np.zeros(ingredients.shape[1] - 1, dtype=np.int64), teaspoons, calorie_target or 0)
+    return best, explored
+
+
+def cookie_scores(
+    ingredients: np.ndarray,
+    teaspoons: int = AVAILABLE_TEASPOONS,
+    calorie_target: int = CALORIE_TARGET,
+) -> tuple[int, int]:
+    """Find the best cookie score, and the best one with exactly calorie_target calories.
+
+    Both come from one enumeration while there are at most ENUMERATION_LIMIT
+    distributions, and from a branch and bound search each beyond that.
+    """
+    if comb(teaspoons + len(ingredients) - 1, len(ingredients) - 1) <= ENUMERATION_LIMIT:
+        return best_cookie_scores(ingredients, teaspoons, calorie_target)
+
+    return (
+        optimize_cookie(ingredients, teaspoons)[0],
+        optimize_cookie(ingredients, teaspoons, calorie_target)[0],
+    )
+
+
+def parse_input(data: str) -> tuple[int, int]:
+    """Find the best cookie scores without and with the calorie target, both at once."""
     ingredients = {}
 
-    for line in data:
+    for line in data.splitlines():
         name, properties = parse_ingredients(line)
         ingredients[name] = properties
 
-    return find_best_cookie_score(include_calories=True)
+    return cookie_scores(ingredient_matrix(ingredients))
+
+
+def part_one(data: tuple[int, int]) -> int:
+    """Find the best cookie score without calorie constraints."""
+    return data[0]
+
+
+def part_two(data: tuple[int, int]) -> int:
+    """Find the best cookie score for combinations that have exactly 500 calories."""
+    return data[1]
 
 
 def solve():
     """Main solve function."""
 
-    data = read_lines(2015, 15)
+    data = parse_input(read_raw(2015, 15))
 
     print(f"Part 1: {part_one(data)}")
     print(f"Part 2: {part_two(data)}")
@@ -3,7 +3,23 @@
 https://adventofcode.com/2015/day/16
 """
 
-from modules.utils.input_reader import read_lines
+import operator
+import random
+
+import numpy as np
+
+from modules.utils.input_reader import read_raw
+
+# A property, a comparison operator and the value to compare with
+Predicate = tuple[str, str, int]
+
+OPERATORS = {
+    "==": operator.eq,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
 
 correct_sue = {
     "children": 3,
@@ -18,6 +34,11 @@ correct_sue = {
     "perfumes": 1,
 }
 
+# The outdated retroencabulator reads ranges rather than exact amounts for these
+OUTDATED_RANGES = {"cats": ">", "trees": ">", "pomeranians": "<", "goldfish": "<"}
+# Groups of Sues smaller than this are scanned rather than searched
+SCANNED_GROUP_SIZE = 256
+
 
 def parse_sue_data(lines: list[str]) -> dict[int, dict[str, int]]:
     """Parse the input data into a dictionary of Sue number -> properties."""
@@ -33,40 +54,166 @@ def parse_sue_data(lines: list[str]) -> dict[int, dict[str, int]]:
     return sue_data
 
 
-def part_one(data) -> int:
-    """Solve part 1."""
-    sue_data = parse_sue_data(data)
+class SueIndex:
+    """Columnar store of Sue properties, indexed by the properties each Sue remembers.
+
+    Every property is a column of values with a mask of the Sues that remember it. The
+    Sues are grouped by the set of properties they remember, and within a group, sorted
+    by value for each of those, so equality and range predicates resolve to a contiguous
+    slice of a group by binary search. Groups too small to be worth searching are kept
+    together as rows to scan.
+    """
+
+    def __init__(self, sues: dict[int, dict[str, int]]):
+        self.numbers = np.array(list(sues), dtype=np.int64)
+        self.values: dict[str, np.ndarray] = {}
+        self.present: dict[str, np.ndarray] = {}
+        self.groups: dict[tuple[str, ...], np.ndarray] = {}
+        self.sorted_rows: dict[tuple[tuple[str, ...], str], np.ndarray] = {}
+        self.sorted_values: dict[tuple[tuple[str, ...], str], np.ndarray] = {}
+        self.scanned_rows = np.zeros(0, dtype=np.int64)
+
+        names = sorted({name for properties in sues.values() for name in properties})
+        for name in names:
+            values = np.zeros(len(self.numbers), dtype=np.int64)
+            present = np.zeros(len(self.numbers), dtype=bool)
+            for row, properties in enumerate(sues.values()):
+                if name in properties:
+                    values[row] = properties[name]
+                    present[row] = True
+            self.values[name] = values
+            self.present[name] = present
+
+        self.add_groups(names)
+
+    def add_groups(self, names: list[str]) -> None:
+        """Group the Sues by the properties they remember and sort each large group by each."""
+        if not names:
+            self.scanned_rows = np.arange(len(self.numbers))
+            return
+
+        # One bit per property, set where the Sue remembers it
+        patterns = np.zeros(len(self.numbers), dtype=object if len(names) > 62 else np.int64)
+        for bit, name in enumerate(names):
+            patterns[self.present[name]] += 1 << bit
+
+        order = np.argsort(patterns, kind="stable")
+        distinct, starts = np.unique(patterns[order], return_index=True)
+        starts = [*starts.tolist(), len(order)]
+        scanned = []
+
+        for index, pattern in enumerate(distinct.tolist()):
+            group = tuple(name for bit, name in enumerate(names) if pattern >> bit & 1)
+            rows = order[starts[index] : starts[index + 1]]
+            if len(rows) < SCANNED_GROUP_SIZE:
+                scanned.append(rows)
+                continue
+
+            self.groups[group] = rows
+            for name in group:
+                by_value = rows[np.argsort(self.values[name][rows], kind="stable")]
+                self.sorted_rows[group, name] = by_value
+                self.sorted_values[group, name] = self.values[name][by_value]
+
+        if scanned:
+            self.scanned_rows = np.sort(np.concatenate(scanned))
+
+    def value_range(self, group: tuple[str, ...], predicate: Predicate) -> slice:
+        """Slice of the sorted index of a group holding the Sues satisfying a predicate."""
+        name, comparison, value = predicate
+        sorted_values = self.sorted_values[group, name]
+        start = np.searchsorted(sorted_values, value, side="left")
+        stop = np.searchsorted(sorted_values, value, side="right")
+
+        if comparison == "==":
+            return slice(start, stop)
+        if comparison == "<":
+            return slice(0, start)
+        if comparison == "<=":
+            return slice(0, stop)
+        if comparison == ">":
+            return slice(stop, len(sorted_values))
+        if comparison == ">=":
+            return slice(start, len(sorted_values))
+
+        raise ValueError(f"Unknown comparison {comparison!r}")
+
+    def query(self, predicates: list[Predicate]) -> np.ndarray:
+        """Numbers of the Sues whose remembered properties satisfy every predicate.
+
+        A property a Sue does not remember never rules her out, so each group only
+        applies the predicates on its own properties: the candidates come from the index
+        of the most selective one, and only those are checked against the columns of the
+        others. A query costs a binary search per group and predicate, plus the candidates
+        of every group; Sues missing a property never become candidates for it. The Sues
+        of small groups are checked against every predicate column by column instead.
+        """
+        scanned = self.scanned_rows
+        for name, comparison, value in predicates:
+            if name in self.values and len(scanned):
+                matching = OPERATORS[comparison](self.values[name][scanned], value)
+                scanned = scanned[~self.present[name][scanned] | matching]
+        matches = [scanned]
+
+        for group, rows in self.groups.items():
+            ranges = sorted(
+                (
+                    (self.value_range(group, predicate), predicate)
+                    for predicate in predicates
+                    if predicate[0] in group
+                ),
+                key=lambda item: item[0].stop - item[0].start,
+            )
+            if not ranges:
+                matches.append(rows)
+                continue
 
-    for sue_number, properties in sue_data.items():
-        if all(properties.get(key, correct_sue[key]) == correct_sue[key] for key in properties):
-            return sue_number
+            (matching, (name, _, _)), *others = ranges
+            rows = self.sorted_rows[group, name][matching]
+            for _, (name, comparison, value) in others:
+                if not len(rows):
+                    break
+                rows = rows[OPERATORS[comparison](self.values[name][rows], value)]
+            matches.append(rows)
 
-    return -1  # Not found
+        return self.numbers[np.sort(np.concatenate(matches))]
 
 
-def part_two(data) -> int:
-    """Solve part 2."""
-    sue_data = parse_sue_data(data)
-
-    for sue_number, properties in sue_data.items():
-        if all(
-            (
-                properties.get(key, correct_sue[key]) > correct_sue[key]
-                if key in ["cats", "trees"]
-                else properties.get(key, correct_sue[key]) < correct_sue[key]
-                if key in ["pomeranians", "goldfish"]
-                else properties.get(key, correct_sue[key]) == correct_sue[key]
-            )
-            for key in properties
-        ):
-            return sue_number
+def ticker_tape_query(ranges: dict[str, str] | None = None) -> list[Predicate]:
+    """Turn the ticker tape into predicates, with an operator per property other than ==."""
+    ranges = ranges or {}
+    return [(name, ranges.get(name, "=="), value) for name, value in correct_sue.items()]
 
-    return -1  # Not found
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """Generate size Sues, each remembering three random compounds with values up to 10."""
+    return "\n".join(
+        f"Sue {number}: "
+        + ", ".join(f"{key}: {rng.randint(0, 10)}" for key in rng.sample(list(correct_sue), 3))
+        for number in range(1, size + 1)
+    )
+
+
+def parse_input(data: str) -> SueIndex:
+    """Parse the input into an index of the properties of every Sue."""
+    return SueIndex(parse_sue_data(data.splitlines()))
+
+
+def part_one(data: SueIndex) -> int:
+    """Solve part 1."""
+    matches = data.query(ticker_tape_query())
+    return int(matches[0]) if len(matches) else -1  # -1 if not found
+
+
+def part_two(data: SueIndex) -> int:
+    """Solve part 2."""
+    matches = data.query(ticker_tape_query(OUTDATED_RANGES))
+    return int(matches[0]) if len(matches) else -1  # -1 if not found
 
 
 def solve():
     """Main solve function."""
-    data = read_lines(2015, 16)
+    data = parse_input(read_raw(2015, 16))
 
     print(f"Part 1: {part_one(data)}")
     print(f"Part 2: {part_two(data)}")